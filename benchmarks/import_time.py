@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Measure how long ``import smartdc`` takes in a fresh interpreter, and fail if
+it exceeds a budget or pulls in the HTTP and signing stacks.
+
+Usage::
+
+    python benchmarks/import_time.py [--budget MS] [--runs N]
+
+The figure reported is the median wall time of ``import smartdc`` less the
+median time of starting an interpreter that imports nothing.
+"""
+from __future__ import print_function
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that should only load on the first request
+LAZY_MODULES = ('requests', 'http_signature', 'multiprocessing', 'uuid',
+                'tempfile', 'aiohttp')
+
+# only count modules that importing smartdc loads, not those the interpreter
+# (or a site-packages hook) had already loaded on start-up
+CHECK = ("import sys; before = set(sys.modules); import smartdc; "
+         "print(','.join(m for m in %r "
+         "if m in sys.modules and m not in before))" % (LAZY_MODULES,))
+
+
+def median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
+
+
+def environment():
+    return dict(os.environ, PYTHONPATH=ROOT + os.pathsep +
+                os.environ.get('PYTHONPATH', ''))
+
+
+def time_command(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code], env=environment())
+        timings.append(time.time() - start)
+    return median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--budget', type=float, default=50.0,
+                        help='maximum import time in milliseconds')
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    loaded = subprocess.check_output([sys.executable, '-c', CHECK],
+                                     env=environment()).decode('ascii').strip()
+    baseline = time_command('pass', args.runs)
+    with_import = time_command('import smartdc', args.runs)
+    cost = (with_import - baseline) * 1000
+    print('import smartdc: %.1f ms (budget %.1f ms)' % (cost, args.budget))
+    failed = False
+    if loaded:
+        print('eagerly imported: %s' % loaded)
+        failed = True
+    if cost > args.budget:
+        print('over budget')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Measure the memory held by a fleet of ``Machine`` objects built from a
+synthetic listing, and fail if it exceeds a per-machine budget.
+
+Usage::
+
+    python benchmarks/machine_memory.py [--count N] [--budget BYTES]
+
+Memory is measured with ``tracemalloc`` where available (Python 3.4+), and
+otherwise from the growth of the peak resident set size, which is too coarse
+(and too dependent on the interpreter) for the budget to be enforced.
+The listing itself is discarded before measuring, so the figure is what an
+inventory keeps resident. Hashing every machine twice is timed as well, as
+the second pass should hit the cached hash.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from smartdc.machine import Machine
+
+STATES = ('running', 'stopped', 'provisioning')
+
+
+def listing(count):
+    # round-trip through JSON so that, as with a real response, no two
+    # machines share string objects
+    for i in range(count):
+        yield json.loads(json.dumps({
+            'id': '%08x-1111-2222-3333-%012x' % (i, i),
+            'name': 'machine-%d' % i,
+            'type': 'smartmachine',
+            'state': STATES[i % len(STATES)],
+            'dataset': 'sdc:sdc:base64:13.1.0',
+            'image': 'f669428c-a939-11e2-a485-b790efc0f0c1',
+            'package': 'g3-standard-1-smartos',
+            'memory': 1024,
+            'disk': 33792,
+            'ips': ['10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255, i & 255)],
+            'metadata': {'root_authorized_keys': 'ssh-rsa AAAA'},
+            'tags': {'role': 'web'},
+            'created': '2013-06-17T12:00:00.000Z',
+            'updated': '2013-06-17T12:05:00.000Z',
+        }))
+
+
+def build(count):
+    return [Machine(datacenter=None, data=d) for d in listing(count)]
+
+
+def measure(count):
+    try:
+        import tracemalloc
+    except ImportError:
+        import resource
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        machines = build(count)
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KiB on Linux
+        return machines, (after - before) * 1024, False
+    tracemalloc.start()
+    machines = build(count)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return machines, used, True
+
+
+def time_hashes(machines):
+    timings = []
+    for _ in range(2):
+        start = time.time()
+        for m in machines:
+            hash(m)
+        timings.append(time.time() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=100000,
+                        help='number of machines to build')
+    parser.add_argument('--budget', type=float, default=1536,
+                        help='maximum bytes per machine')
+    args = parser.parse_args()
+
+    machines, used, exact = measure(args.count)
+    per_machine = used / float(args.count)
+    first, second = time_hashes(machines)
+    print('%d machines: %.1f MiB, %.0f bytes each (budget %.0f%s)' % (
+          args.count, used / 1048576.0, per_machine, args.budget,
+          '' if exact else ', not enforced'))
+    print('hash: %.1f ms first pass, %.1f ms cached' % (
+          first * 1000, second * 1000))
+    if exact and per_machine > args.budget:
+        print('over budget')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
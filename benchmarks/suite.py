@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+"""
+Time the client's hot paths against a local CloudAPI simulator and write
+the results as JSON, optionally comparing them with an earlier run.
+
+Usage::
+
+    python benchmarks/suite.py [--output FILE] [--compare FILE]
+                               [--threshold RATIO] [--quick] [NAME ...]
+
+Each benchmark is run ``--repeat`` times and the fastest run is kept, as
+the least disturbed by the rest of the system. With ``--compare``, every
+benchmark present in both runs is reported as a ratio of new to old time
+per operation, and the exit status is 1 if any ratio exceeds
+``--threshold``. Benchmarks whose requirements are missing (such as
+``http_signature`` or ``ssh-keygen`` for signing) are reported as skipped.
+"""
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from smartdc.datacenter import search_dicts
+from smartdc.machine import Machine, PollPolicy
+from smartdc.simulator import CloudAPISimulator
+
+timer = getattr(time, 'perf_counter', time.time)
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+
+class Skip(Exception):
+    pass
+
+
+def best(repeat, func):
+    """
+    :Returns: the shortest of `repeat` timings of `func`, and its result
+    """
+    timings = []
+    for _ in range(repeat):
+        start = timer()
+        result = func()
+        timings.append(timer() - start)
+    return min(timings), result
+
+
+def result(seconds, ops, **extra):
+    extra.update(seconds=seconds, ops=ops,
+                 per_op_us=seconds / ops * 1e6 if ops else None)
+    return extra
+
+
+def sample_listing(count):
+    # the simulator's fleet, without starting its server
+    sim = CloudAPISimulator(fleet_size=count)
+    return [dict(sim.machines[i]) for i in sim._order]
+
+
+class StubSession(object):
+    """
+    Answers every request with the same prepared response, so that only
+    the client's own work is timed.
+    """
+    def __init__(self, body):
+        self.body = json.dumps(body).encode('utf-8')
+
+    def request(self, method, url, **kwargs):
+        import requests
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = self.body
+        resp.headers['content-type'] = 'application/json'
+        return resp
+
+
+@benchmark
+def request_overhead(args):
+    """DataCenter.request with the network stubbed out"""
+    listing = sample_listing(1)
+    with CloudAPISimulator(fleet_size=0) as sim:
+        dc = sim.datacenter(session=StubSession(listing[0]))
+    n = args.ops
+    seconds, _ = best(args.repeat,
+        lambda: [dc.request('GET', '/machines/x') for _ in range(n)])
+    return result(seconds, n)
+
+
+@benchmark
+def request_roundtrip(args):
+    """DataCenter.request against the simulator over localhost"""
+    with CloudAPISimulator(fleet_size=1) as sim:
+        dc = sim.datacenter()
+        path = '/machines/' + sim._order[0]
+        n = args.ops // 10
+        seconds, _ = best(args.repeat,
+            lambda: [dc.request('GET', path) for _ in range(n)])
+    return result(seconds, n)
+
+
+def machines_throughput(count, workers=1):
+    def run(args):
+        with CloudAPISimulator(fleet_size=count) as sim:
+            dc = sim.datacenter()
+            seconds, machines = best(args.repeat,
+                lambda: dc.machines(workers=workers))
+        assert len(machines) == count
+        return result(seconds, count, machines_per_second=count / seconds)
+    run.__name__ = 'machines_{0}k{1}'.format(count // 1000,
+        '_workers{0}'.format(workers) if workers > 1 else '')
+    run.__doc__ = 'DataCenter.machines() listing {0} machines'.format(count)
+    return run
+
+
+for _count in (1000, 10000, 50000):
+    benchmark(machines_throughput(_count))
+benchmark(machines_throughput(10000, workers=4))
+
+
+@benchmark
+def machine_construction(args):
+    """Machine objects built from listing dicts"""
+    raw = json.dumps(sample_listing(args.ops))
+    def build():
+        return [Machine(datacenter=None, data=d) for d in json.loads(raw)]
+    seconds, _ = best(args.repeat, build)
+    decode, _ = best(args.repeat, lambda: json.loads(raw))
+    return result(seconds - decode, args.ops)
+
+
+@benchmark
+def machine_save(args):
+    """Machine._save of a listing dict into an existing machine"""
+    listing = sample_listing(args.ops)
+    machines = [Machine(datacenter=None, data=dict(d)) for d in listing]
+    pairs = list(zip(machines, listing))
+    def save():
+        for m, d in pairs:
+            m._save(d)
+    seconds, _ = best(args.repeat, save)
+    return result(seconds, args.ops)
+
+
+@benchmark
+def search_catalog(args):
+    """search_dicts over a 10k entry catalog"""
+    catalog = [{'name': 'package-{0}'.format(i),
+                'description': 'standard {0} GiB'.format(i % 64),
+                'urn': 'sdc:sdc:pkg-{0}:1.0.{1}'.format(i % 97, i)}
+               for i in range(10000)]
+    seconds, found = best(args.repeat, lambda: list(search_dicts(catalog,
+        r'standard (12|36) gib', ('description', 'urn'))))
+    return result(seconds, len(catalog), matches=len(found))
+
+
+@benchmark
+def signing(args):
+    """RSA request signing, computed and reused"""
+    try:
+        from http_signature.requests_auth import HTTPSignatureAuth
+    except ImportError:
+        raise Skip('http_signature is not installed')
+    from smartdc.auth import CachedSignatureAuth
+    directory = tempfile.mkdtemp()
+    try:
+        key = os.path.join(directory, 'id_rsa')
+        try:
+            subprocess.check_call(['ssh-keygen', '-q', '-t', 'rsa', '-b',
+                '2048', '-m', 'PEM', '-N', '', '-f', key])
+        except (OSError, subprocess.CalledProcessError):
+            raise Skip('ssh-keygen is unavailable')
+        auth = CachedSignatureAuth(HTTPSignatureAuth(key_id='/sim/keys/id',
+            secret=key))
+    finally:
+        shutil.rmtree(directory)
+
+    class Request(object):
+        def __init__(self, date):
+            self.headers = {'Date': date}
+
+    n = args.ops // 10
+    dates = ['Thu, 01 Jan 2015 00:{0:02d}:{1:02d} GMT'.format(i // 60 % 60,
+             i % 60) for i in range(n)]
+    computed, _ = best(args.repeat,
+        lambda: [auth(Request(d)) for d in dates])
+    reused, _ = best(args.repeat,
+        lambda: [auth(Request(dates[0])) for _ in range(n)])
+    return result(computed, n, reused_per_op_us=reused / n * 1e6)
+
+
+@benchmark
+def poll_loop(args):
+    """Machine.poll_until through a stop transition"""
+    with CloudAPISimulator(fleet_size=1, transition_time=0.2) as sim:
+        dc = sim.datacenter()
+        policy = PollPolicy(interval=0.01, backoff=1, jitter=0)
+        def poll():
+            machine = dc.machine(sim._order[0])
+            if machine.state == 'stopped':
+                machine.start()
+                machine.poll_until('running', policy=policy)
+            before = sim.requests
+            machine.stop()
+            machine.poll_until('stopped', policy=policy)
+            return sim.requests - before - 1
+        seconds, polls = best(args.repeat, poll)
+    return result(seconds, polls, polls=polls)
+
+
+def commit():
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                cwd=ROOT, stderr=devnull).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    failed = False
+    for name, new in sorted(current['results'].items()):
+        old = baseline.get('results', {}).get(name)
+        if not old or not old.get('per_op_us') or not new.get('per_op_us'):
+            continue
+        ratio = new['per_op_us'] / old['per_op_us']
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            failed = True
+        print('{0:<28} {1:>10.2f} -> {2:>10.2f} us/op  x{3:.2f}{4}'.format(
+              name, old['per_op_us'], new['per_op_us'], ratio, flag))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--compare', help='earlier results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio counted as a regression')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--ops', type=int, default=10000,
+                        help='operations per benchmark where adjustable')
+    parser.add_argument('--quick', action='store_true',
+                        help='skip the 50k machine listing and use fewer '
+                             'operations')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args()
+    if args.list:
+        for func in BENCHMARKS:
+            print('{0:<28} {1}'.format(func.__name__, func.__doc__))
+        return 0
+    if args.quick:
+        args.ops = min(args.ops, 2000)
+        args.repeat = 1
+    selected = [f for f in BENCHMARKS
+                if (f.__name__ in args.names if args.names else
+                    not (args.quick and f.__name__ == 'machines_50k'))]
+
+    results = {}
+    for func in selected:
+        try:
+            results[func.__name__] = func(args)
+        except Skip as e:
+            results[func.__name__] = {'skipped': str(e)}
+        r = results[func.__name__]
+        if 'skipped' in r:
+            print('{0:<28} skipped: {1}'.format(func.__name__, r['skipped']))
+        else:
+            print('{0:<28} {1:>10.2f} us/op  ({2} ops in {3:.3f} s)'.format(
+                  func.__name__, r['per_op_us'], r['ops'], r['seconds']))
+    report = {'commit': commit(), 'python': platform.python_version(),
+              'platform': platform.platform(), 'time': time.time(),
+              'repeat': args.repeat, 'ops': args.ops, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,9 @@
+import re
 from setuptools import setup, find_packages
-import versioneer
 
-versioneer.VCS = 'git'
-versioneer.versionfile_source = 'smartdc/_version.py'
-versioneer.versionfile_build = 'smartdc/_version.py'
-versioneer.tag_prefix = 'v' # tags are like 1.2.0
-versioneer.parentdir_prefix = 'smartdc-' # dirname like 'myproject-1.2.0'
+# read rather than import, so that building needs no dependencies
+with open('smartdc/__init__.py') as file:
+    version = re.search(r"^__version__ = '([^']+)'", file.read(), re.M).group(1)
 
 with open('README.rst') as file:
     long_description = file.read()
@@ -14,8 +12,7 @@ with open('CHANGES.rst') as file:
 
 setup(
     name='smartdc',
-    version=versioneer.get_version(),
-    cmdclass=versioneer.get_cmdclass(),
+    version=version,
     description="Joyent SmartDataCenter CloudAPI connector using http-signature authentication via Requests",
     long_description=long_description,
     classifiers=[
@@ -35,8 +32,12 @@ setup(
     author_email='a.lindsay+github@gmail.com',
     url='https://github.com/atl/py-smartdc',
     license='MIT',
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests']),
     include_package_data=True,
     zip_safe=True,
     install_requires=['requests','http-signature'],
+    test_suite='tests',
+    extras_require={
+        'async': ['aiohttp'],
+    },
 )
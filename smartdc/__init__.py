@@ -1,7 +1,5 @@
+__version__ = '0.3.0.dev0'
+
 from .datacenter import *
 from .machine import *
 from .legacy import LegacyDataCenter
-
-from ._version import get_versions
-__version__ = get_versions()['version']
-del get_versions
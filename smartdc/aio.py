@@ -0,0 +1,699 @@
+from __future__ import print_function
+import sys
+import json
+import time
+import asyncio
+from datetime import datetime
+
+import aiohttp
+
+from .datacenter import DataCenter
+from .machine import Machine, Snapshot, PollPolicy
+
+__all__ = ['AsyncDataCenter', 'AsyncMachine', 'AsyncSnapshot']
+
+# failures that may pass on retrying
+_TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                     asyncio.TimeoutError)
+
+
+class _Signable(object):
+    """
+    Minimal stand-in for a prepared request, so that the `requests` auth
+    object of a :py:class:`smartdc.datacenter.DataCenter` may sign headers
+    for an :py:mod:`aiohttp` request.
+    """
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def _query_params(params):
+    """
+    :py:mod:`aiohttp` only accepts strings and numbers as query values,
+    whereas `requests` stringifies everything.
+    """
+    if not params:
+        return None
+    return dict((k, v if isinstance(v, (int, float)) and
+                 not isinstance(v, bool) else str(v))
+                for k, v in params.items())
+
+
+def _client_timeout(timeout):
+    """
+    Translate a :py:mod:`requests`-style timeout (seconds, or a ``(connect,
+    read)`` tuple) into an :py:class:`aiohttp.ClientTimeout`.
+    """
+    if isinstance(timeout, aiohttp.ClientTimeout):
+        return timeout
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+async def _poll(resource, condition, policy):
+    """
+    Coroutine version of :py:func:`smartdc.machine._poll`.
+    """
+    terminal = policy.terminal
+    if terminal is None:
+        terminal = resource.TERMINAL_STATES
+    delays = policy.delays()
+    while True:
+        current = await resource.status()
+        if condition(current) or current in terminal:
+            return current
+        await asyncio.sleep(next(delays))
+
+
+class AsyncDataCenter(object):
+    """
+    An :py:mod:`asyncio` counterpart to
+    :py:class:`smartdc.datacenter.DataCenter`.
+    
+    An :py:class:`smartdc.aio.AsyncDataCenter` wraps a configured
+    :py:class:`smartdc.datacenter.DataCenter` and reuses its location, login,
+    authentication and headers, but performs requests on the running event
+    loop through a pooled :py:class:`aiohttp.ClientSession`. Methods that
+    contact the server are coroutines returning the same shapes as their
+    synchronous namesakes.
+    
+    Requires Python 3.5+ and `aiohttp`.
+    """
+    def __init__(self, datacenter=None, limit=100, **kwargs):
+        """
+        :param datacenter: the source of configuration and credentials; if
+            omitted, one is created from the remaining keyword arguments
+        :type datacenter: :py:class:`smartdc.datacenter.DataCenter`
+        
+        :param limit: maximum number of simultaneous connections
+        :type limit: :py:class:`int`
+        """
+        self.datacenter = datacenter or DataCenter(**kwargs)
+        self.limit = limit
+        self._session = None
+    
+    def __str__(self):
+        return str(self.datacenter)
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {dc}>'.format(module=self.__module__,
+            cls=self.__class__.__name__, dc=repr(self.datacenter))
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+    
+    async def close(self):
+        """
+        Close the pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    @property
+    def session(self):
+        """
+        The :py:class:`aiohttp.ClientSession`, created on first use inside
+        the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit,
+                force_close=not self.datacenter.keep_alive)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    @property
+    def url(self):
+        """Base URL for SmartDC requests"""
+        return self.datacenter.url
+    
+    async def request(self, method, path, headers=None, data=None, **kwargs):
+        """
+        Coroutine version of
+        :py:meth:`smartdc.datacenter.DataCenter.request`.
+        
+        :Returns: tuple of decoded response body &
+            :py:class:`aiohttp.ClientResponse` object
+        :raises: client (4xx) and server (5xx) errors left once retries
+            are exhausted
+        
+        The `timeout` may be given as for the synchronous version, or as an
+        :py:class:`aiohttp.ClientTimeout`. Deadlines are not tracked here;
+        bound a sequence of coroutines with :py:func:`asyncio.wait_for`.
+        Nor does the DataCenter's `rate_limit` apply, as its limiter blocks
+        the calling thread: concurrency is bounded by the connection `limit`
+        instead. Failed requests are retried following the DataCenter's
+        `retry` policy, or a `retry` passed in, each attempt being signed
+        afresh.
+        """
+        dc = self.datacenter
+        timeout = kwargs.pop('timeout', None)
+        if timeout is None:
+            timeout = (dc.connect_timeout, dc.read_timeout)
+        retry = kwargs.pop('retry', None)
+        if retry is None:
+            retry = dc.retry
+        attempt = 0
+        full_path = dc.url + path
+        request_headers = dc._request_headers(headers)
+        jdata = None
+        if data:
+            jdata = json.dumps(data)
+        for hook in dc.hooks['before_request']:
+            hook(method, path, request_headers)
+        if dc.verbose:
+            print("%s\t%s\t%s" %
+                (datetime.now().isoformat(), method, full_path),
+                file=dc.verbose)
+        params = _query_params(kwargs.pop('params', None))
+        agent_keys = dc._agent_keys()
+        agent_key = agent_keys.pop(0) if agent_keys else None
+        start = time.time()
+        while True:
+            # sign a copy, so that a retry gets a new Date and signature
+            attempt_headers = dict(request_headers)
+            sign = dc._timed_auth(agent_key)
+            if sign is not None:
+                sign(_Signable(attempt_headers))
+            try:
+                async with self.session.request(method, full_path,
+                        params=params, headers=attempt_headers, data=jdata,
+                        timeout=_client_timeout(timeout),
+                        ssl=True if dc.verify else False, **kwargs) as resp:
+                    content = await resp.read()
+            except _TRANSIENT_ERRORS:
+                pause = retry.wait(attempt, method) if retry else None
+                if pause is None:
+                    dc._record(method, path, None, time.time() - start, jdata)
+                    raise
+            except Exception:
+                dc._record(method, path, None, time.time() - start, jdata)
+                raise
+            else:
+                if resp.status == 401 and agent_keys:
+                    agent_key = agent_keys.pop(0)
+                    dc.metrics.record_retry(method, path)
+                    continue
+                pause = retry.wait(attempt, method, resp.status,
+                    resp.headers) if retry else None
+                if pause is None:
+                    break
+            attempt += 1
+            dc.metrics.record_retry(method, path)
+            await asyncio.sleep(pause)
+        dc._record(method, path, resp, time.time() - start, jdata, content,
+            status=resp.status)
+        if agent_key is not None and resp.status != 401:
+            dc._remember_agent_key(agent_key)
+        if resp.status >= 400:
+            if content:
+                print(content, file=sys.stderr)
+            resp.raise_for_status()
+        if content:
+            if resp.headers.get('content-type') == 'application/json':
+                return (dc.json_loads(content), resp)
+            else:
+                return (content, resp)
+        else:
+            return (None, resp)
+    
+    async def raw_machine_data(self, machine_id, credentials=False):
+        """
+        ::
+        
+            GET /:login/machines/:machine
+        
+        Coroutine version of
+        :py:meth:`smartdc.datacenter.DataCenter.raw_machine_data`.
+        """
+        params = {}
+        if isinstance(machine_id, dict):
+            machine_id = machine_id['id']
+        if credentials:
+            params['credentials'] = True
+        j, _ = await self.request('GET', '/machines/' + str(machine_id),
+                params=params)
+        return j
+    
+    async def machine(self, machine_id, credentials=False):
+        """
+        ::
+        
+            GET /:login/machines/:id
+        
+        :rtype: :py:class:`smartdc.aio.AsyncMachine`
+        """
+        if isinstance(machine_id, dict):
+            machine_id = machine_id['id']
+        elif isinstance(machine_id, Machine):
+            machine_id = machine_id.id
+        data = await self.raw_machine_data(machine_id,
+                credentials=credentials)
+        return AsyncMachine(datacenter=self, data=data)
+    
+    async def machines(self, **kwargs):
+        """
+        ::
+        
+            GET /:login/machines
+        
+        Coroutine version of
+        :py:meth:`smartdc.datacenter.DataCenter.machines`, accepting the same
+        predicates. Pages after the first are requested concurrently.
+        
+        :rtype: :py:class:`list` of :py:class:`smartdc.aio.AsyncMachine`\s
+        """
+        paged = kwargs.pop('paged', False)
+        limit = kwargs.pop('limit', None)
+        offset = kwargs.pop('offset', None) or 0
+        kwargs.pop('workers', None)
+        params = self.datacenter._machine_params(**kwargs)
+        if limit:
+            params['limit'] = limit
+        if offset:
+            params['offset'] = offset
+        j, r = await self.request('GET', '/machines', params=params)
+        machines = list(j)
+        if not paged:
+            offsets = DataCenter._remaining_offsets(r, offset, len(j))
+            pages = await asyncio.gather(*[
+                self.request('GET', '/machines', params=dict(params, offset=o))
+                for o in offsets])
+            for page, _ in pages:
+                machines.extend(page or [])
+        return [AsyncMachine(datacenter=self, data=m) for m in machines]
+
+    async def create_machine(self, name=None, package=None, dataset=None,
+            metadata=None, tags=None, boot_script=None, credentials=False,
+            image=None, networks=None):
+        """
+        ::
+        
+            POST /:login/machines
+        
+        Coroutine version of
+        :py:meth:`smartdc.datacenter.DataCenter.create_machine`, taking the
+        same arguments.
+        
+        :rtype: :py:class:`smartdc.aio.AsyncMachine`
+        """
+        params = self.datacenter._creation_params(name=name, package=package,
+            dataset=dataset, metadata=metadata, tags=tags,
+            boot_script=boot_script, image=image, networks=networks)
+        j, _ = await self.request('POST', '/machines', data=params)
+        return AsyncMachine(datacenter=self, data=j)
+
+
+class AsyncMachine(Machine):
+    """
+    A :py:class:`smartdc.machine.Machine` whose remote operations are
+    coroutines, bound to a :py:class:`smartdc.aio.AsyncDataCenter`.
+    
+    Instances must be created from existing `data`, typically by
+    :py:meth:`smartdc.aio.AsyncDataCenter.machine`,
+    :py:meth:`smartdc.aio.AsyncDataCenter.machines` or
+    :py:meth:`smartdc.aio.AsyncDataCenter.create_machine`.
+    """
+    __slots__ = ()
+    
+    def __init__(self, datacenter, machine_id=None, data=None,
+            credentials=False):
+        if not data:
+            raise ValueError('AsyncMachine requires data: use '
+                'AsyncDataCenter.machine() to fetch a machine by id')
+        super(AsyncMachine, self).__init__(datacenter, machine_id=machine_id,
+            data=data, credentials=credentials)
+    
+    @property
+    def ips(self):
+        """
+        Known IP addresses; call :py:meth:`refresh` to update them.
+        """
+        return self._ips
+    
+    @classmethod
+    async def create_in_datacenter(cls, datacenter, **kwargs):
+        """
+        ::
+        
+            POST /:login/machines
+        
+        Coroutine version of
+        :py:meth:`smartdc.machine.Machine.create_in_datacenter`.
+        
+        :param datacenter: datacenter for creating the machine
+        :type datacenter: :py:class:`smartdc.aio.AsyncDataCenter`
+        """
+        return await datacenter.create_machine(**kwargs)
+    
+    async def refresh(self, credentials=False):
+        """
+        ::
+        
+            GET /:login/machines/:id
+        """
+        data = await self.datacenter.raw_machine_data(self.id,
+                credentials=credentials)
+        self._save(data)
+    
+    async def credentials(self):
+        """
+        ::
+        
+            GET /:login/machines/:id?credentials=True
+        """
+        if not self._credentials:
+            await self.refresh(credentials=True)
+        return self._credentials
+    
+    async def status(self):
+        """
+        ::
+        
+            GET /:login/machines/:id
+        """
+        try:
+            await self.refresh()
+        except aiohttp.ClientResponseError as e:
+            if e.status not in self.GONE_STATUSES:
+                raise
+            self.state = 'deleted'
+        return self.state
+    
+    async def _action(self, action):
+        j, r = await self.datacenter.request('POST', self.path, params=action)
+        r.raise_for_status()
+    
+    async def stop(self):
+        """
+        ::
+        
+            POST /:login/machines/:id?action=stop
+        """
+        await self._action({'action': 'stop'})
+    
+    async def start(self):
+        """
+        ::
+        
+            POST /:login/machines/:id?action=start
+        """
+        await self._action({'action': 'start'})
+    
+    async def reboot(self):
+        """
+        ::
+        
+            POST /:login/machines/:id?action=reboot
+        """
+        await self._action({'action': 'reboot'})
+    
+    async def resize(self, package):
+        """
+        ::
+        
+            POST /:login/machines/:id?action=resize
+        """
+        if isinstance(package, dict):
+            package = package['name']
+        await self._action({'action': 'resize', 'package': package})
+    
+    async def delete(self):
+        """
+        ::
+        
+            DELETE /:login/machines/:id
+        """
+        j, r = await self.datacenter.request('DELETE', self.path)
+        r.raise_for_status()
+    
+    async def poll_until(self, state, interval=2, timeout=None, policy=None):
+        """
+        ::
+        
+            GET /:login/machines/:id
+        
+        Poll without blocking the event loop until `state` (or a terminal 
+        state) is reached, as :py:meth:`smartdc.machine.Machine.poll_until`.
+        """
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return await _poll(self, lambda current: current == state, policy)
+    
+    async def poll_while(self, state, interval=2, timeout=None, policy=None):
+        """
+        ::
+        
+            GET /:login/machines/:id
+        
+        Poll without blocking the event loop while `state` persists, as 
+        :py:meth:`smartdc.machine.Machine.poll_while`.
+        """
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return await _poll(self, lambda current: current != state, policy)
+    
+    async def get_metadata(self):
+        """
+        ::
+        
+            GET /:login/machines/:id/metadata
+        """
+        j, _ = await self.datacenter.request('GET', self.path + '/metadata')
+        self.metadata = j
+        return j
+    
+    async def update_metadata(self, **kwargs):
+        """
+        ::
+        
+            POST /:login/machines/:id/metadata
+        """
+        j, _ = await self.datacenter.request('POST', self.path + '/metadata',
+                    data=kwargs)
+        self.metadata = j
+        return j
+    
+    async def delete_metadata_at_key(self, key):
+        """
+        ::
+        
+            DELETE /:login/machines/:id/metadata/:key
+        """
+        j, r = await self.datacenter.request('DELETE',
+                    self.path + '/metadata/' + key)
+        r.raise_for_status()
+        return await self.get_metadata()
+    
+    async def set_boot_script(self, filename):
+        """
+        ::
+        
+            POST /:login/machines/:id/metadata
+        """
+        data = {}
+        with open(filename) as f:
+            data['user-script'] = f.read()
+        j, r = await self.datacenter.request('POST', self.path + '/metadata',
+                    data=data)
+        r.raise_for_status()
+        self.boot_script = data['user-script']
+    
+    async def delete_boot_script(self):
+        """
+        ::
+        
+            DELETE /:login/machines/:id/metadata/user-script
+        """
+        j, r = await self.datacenter.request('DELETE', self.path +
+                '/metadata/user-script')
+        r.raise_for_status()
+        self.boot_script = None
+    
+    async def delete_all_metadata(self):
+        """
+        ::
+        
+            DELETE /:login/machines/:id/metadata
+        """
+        j, r = await self.datacenter.request('DELETE',
+                    self.path + '/metadata')
+        r.raise_for_status()
+        return await self.get_metadata()
+    
+    async def get_tags(self):
+        """
+        ::
+        
+            GET /:login/machines/:id/tags
+        """
+        j, _ = await self.datacenter.request('GET', self.path + '/tags')
+        return j
+    
+    async def add_tags(self, **kwargs):
+        """
+        ::
+        
+            POST /:login/machines/:id/tags
+        """
+        j, _ = await self.datacenter.request('POST', self.path + '/tags',
+            data=kwargs)
+        return j
+    
+    async def get_tag(self, tag):
+        """
+        ::
+        
+            GET /:login/machines/:id/tags/:tag
+        """
+        j, _ = await self.datacenter.request('GET',
+            self.path + '/tags/' + tag)
+        return j
+    
+    async def delete_tag(self, tag):
+        """
+        ::
+        
+            DELETE /:login/machines/:id/tags/:tag
+        """
+        j, r = await self.datacenter.request('DELETE',
+            self.path + '/tags/' + tag)
+        r.raise_for_status()
+    
+    async def delete_all_tags(self):
+        """
+        ::
+        
+            DELETE /:login/machines/:id/tags
+        """
+        j, r = await self.datacenter.request('DELETE', self.path + '/tags')
+        r.raise_for_status()
+    
+    async def raw_snapshot_data(self, name):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        """
+        j, _ = await self.datacenter.request('GET',
+            self.path + '/snapshots/' + str(name))
+        return j
+    
+    async def snapshots(self):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots
+        
+        :rtype: :py:class:`list` of :py:class:`smartdc.aio.AsyncSnapshot`
+        """
+        j, _ = await self.datacenter.request('GET', self.path + '/snapshots')
+        return [AsyncSnapshot(machine=self, data=s) for s in j]
+    
+    async def create_snapshot(self, name):
+        """
+        ::
+        
+            POST /:login/machines/:id/snapshots
+        
+        :rtype: :py:class:`smartdc.aio.AsyncSnapshot`
+        """
+        params = {'name': name}
+        j, _ = await self.datacenter.request('POST',
+            self.path + '/snapshots', data=params)
+        return AsyncSnapshot(machine=self, data=j, name=name)
+    
+    async def start_from_snapshot(self, name):
+        """
+        ::
+        
+            POST /:login/machines/:id/snapshots/:name
+        """
+        _, r = await self.datacenter.request('POST',
+            self.path + '/snapshots/' + str(name))
+        r.raise_for_status()
+        return self
+    
+    async def snapshot(self, name):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        
+        :rtype: :py:class:`smartdc.aio.AsyncSnapshot`
+        """
+        data = await self.raw_snapshot_data(name)
+        return AsyncSnapshot(machine=self, name=name, data=data)
+
+
+class AsyncSnapshot(Snapshot):
+    """
+    A :py:class:`smartdc.machine.Snapshot` whose remote operations are
+    coroutines, belonging to a :py:class:`smartdc.aio.AsyncMachine`.
+    """
+    __slots__ = ()
+    
+    def __init__(self, machine, name=None, data=None):
+        if not data:
+            raise ValueError('AsyncSnapshot requires data: use '
+                'AsyncMachine.snapshot() to fetch a snapshot by name')
+        super(AsyncSnapshot, self).__init__(machine, name=name, data=data)
+    
+    async def refresh(self):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        """
+        data = await self.machine.raw_snapshot_data(self.name)
+        self._save(data)
+    
+    async def status(self):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        """
+        await self.refresh()
+        return self.state
+    
+    async def poll_until(self, state, interval=2, timeout=None, policy=None):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        """
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return await _poll(self, lambda current: current == state, policy)
+    
+    async def poll_while(self, state, interval=2, timeout=None, policy=None):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        """
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return await _poll(self, lambda current: current != state, policy)
+    
+    async def delete(self):
+        """
+        ::
+        
+            DELETE /:login/machines/:id/snapshots/:name
+        """
+        _, r = await self.machine.datacenter.request('DELETE', self.path)
+        r.raise_for_status()
+    
+    async def start(self):
+        """
+        ::
+        
+            POST /:login/machines/:id/snapshots/:name
+        """
+        _, r = await self.machine.datacenter.request('POST', self.path)
+        r.raise_for_status()
+        return self.machine
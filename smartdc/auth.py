@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import errno
+import binascii
+import threading
+from wsgiref.handlers import format_date_time
+
+from .cache import write_json
+
+__all__ = ['CachedSignatureAuth', 'AgentKeyMemory', 'signature_auth', 
+           'KEY_MEMORY']
+
+
+class CachedSignatureAuth(object):
+    """
+    Wraps an :py:class:`http_signature.requests_auth.HTTPSignatureAuth` so
+    that requests sharing a ``Date`` header share one signature.
+    
+    When only the ``Date`` header is signed (the default), the
+    ``Authorization`` header depends on nothing but that date, which has a
+    resolution of one second. This reuses the last signature for every
+    request made in the same second, rather than performing an RSA operation
+    or an ssh-agent round trip for each one. The `signatures` and `reuses`
+    counters show how often each happened.
+    
+    With an ssh-agent, `agent_keys` lists the agent's RSA keys, and each 
+    call may name the key to sign with, so that DataCenters sharing this 
+    object can each use (and fall back through) their own choice of key.
+    """
+    def __init__(self, auth):
+        """
+        :param auth: the signing auth object to wrap
+        :type auth: :py:class:`http_signature.requests_auth.HTTPSignatureAuth`
+        """
+        self.auth = auth
+        self.signatures = 0
+        self.reuses = 0
+        self._last = None
+        self._lock = threading.Lock()
+        self._agent_lock = threading.Lock()
+        signer = auth.signer
+        if getattr(signer, '_agent_key', None):
+            self.agent_keys = [signer._agent_key] + list(signer._keys or ())
+        else:
+            self.agent_keys = []
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {sigs} signatures, {reuses} reuses>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            sigs=self.signatures, reuses=self.reuses)
+    
+    @property
+    def signer(self):
+        """The wrapped :py:class:`http_signature.sign.Signer`"""
+        return self.auth.signer
+    
+    @property
+    def key_id(self):
+        return self.auth.key_id
+    
+    def __call__(self, r, agent_key=None):
+        """
+        Sign the request `r`, with `agent_key` (one of the `agent_keys`) if 
+        given, or else the first agent key or the key file.
+        """
+        if agent_key is None and self.agent_keys:
+            agent_key = self.agent_keys[0]
+        if self.auth.headers:
+            self._sign(r, agent_key)
+            with self._lock:
+                self.signatures += 1
+            return r
+        if 'Date' not in r.headers:
+            r.headers['Date'] = format_date_time(time.time())
+        key = (r.headers['Date'], agent_key)
+        with self._lock:
+            last = self._last
+            if last is not None and last[0] == key:
+                r.headers['Authorization'] = last[1]
+                self.reuses += 1
+                return r
+        self._sign(r, agent_key)
+        with self._lock:
+            self._last = (key, r.headers['Authorization'])
+            self.signatures += 1
+        return r
+    
+    def _sign(self, r, agent_key):
+        if agent_key is None:
+            self.auth(r)
+            return
+        # the signer holds its agent key as state, and the agent connection 
+        # is not safe to share between threads, so the key is chosen and 
+        # used under one lock
+        with self._agent_lock:
+            self.signer._agent_key = agent_key
+            self.auth(r)
+    
+    def stats(self):
+        """
+        :Returns: the number of signatures computed and reused
+        :rtype: :py:class:`dict`
+        """
+        return {'signatures': self.signatures, 'reuses': self.reuses}
+
+
+_shared_auths = {}
+_shared_lock = threading.Lock()
+
+
+def signature_auth(key_id, secret, allow_agent=False):
+    """
+    :param key_id: SmartDC identifier for the ssh key
+    :type key_id: :py:class:`basestring`
+    
+    :param secret: path to private rsa key
+    :type secret: :py:class:`basestring`
+    
+    :param allow_agent: whether or not to try ssh-agent
+    :type allow_agent: :py:class:`bool`
+    
+    :rtype: :py:class:`smartdc.auth.CachedSignatureAuth`
+    
+    Return the process-wide auth object for these credentials, creating it 
+    on first use. Sharing it between DataCenters keeps one ssh-agent 
+    connection open (and the key file read once) for the life of the process.
+    """
+    key = (key_id, secret, allow_agent)
+    with _shared_lock:
+        auth = _shared_auths.get(key)
+        if auth is None:
+            from http_signature.requests_auth import HTTPSignatureAuth
+            auth = CachedSignatureAuth(HTTPSignatureAuth(key_id=key_id, 
+                secret=secret, allow_agent=allow_agent))
+            _shared_auths[key] = auth
+    return auth
+
+
+def agent_fingerprint(key):
+    """
+    :Returns: the hex MD5 fingerprint of an ssh-agent key
+    """
+    return binascii.hexlify(key.get_fingerprint()).decode('ascii')
+
+
+def order_agent_keys(keys, fingerprint=None):
+    """
+    :param keys: ssh-agent keys
+    :type keys: :py:class:`list`
+    
+    :param fingerprint: fingerprint of the key to try first
+    :type fingerprint: :py:class:`str`
+    
+    :Returns: a new list of `keys`, with the key matching `fingerprint` (if 
+        any) moved to the front
+    :rtype: :py:class:`list`
+    """
+    keys = list(keys)
+    if fingerprint:
+        for i, k in enumerate(keys):
+            if agent_fingerprint(k) == fingerprint:
+                keys.insert(0, keys.pop(i))
+                break
+    return keys
+
+
+class AgentKeyMemory(object):
+    """
+    Remembers which ssh-agent key (by fingerprint) authenticated against each 
+    datacenter and login, so that later DataCenters start with the working 
+    key instead of rediscovering it through failed requests.
+    
+    By default this is kept in memory for the life of the process 
+    (:py:data:`smartdc.auth.KEY_MEMORY`). Given a `path`, it is also loaded 
+    from and saved to a JSON file, written atomically, for use by later 
+    processes.
+    """
+    def __init__(self, path=None):
+        """
+        :param path: optional file in which to persist the fingerprints
+        :type path: :py:class:`basestring`
+        """
+        self.path = path and os.path.expanduser(path)
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        if self.path:
+            self._fingerprints.update(self._load())
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} keys{path}>'.format(
+            module=self.__module__, cls=self.__class__.__name__, 
+            n=len(self._fingerprints), 
+            path=' in ' + self.path if self.path else '')
+    
+    def get(self, base_url, login):
+        """
+        :Returns: the fingerprint last known to work, or ``None``
+        """
+        return self._fingerprints.get(base_url + '/' + login)
+    
+    def remember(self, base_url, login, fingerprint):
+        """
+        Record the `fingerprint` that worked for `base_url` and `login`.
+        """
+        key = base_url + '/' + login
+        if self._fingerprints.get(key) == fingerprint:
+            return
+        with self._lock:
+            self._fingerprints[key] = fingerprint
+            if self.path:
+                stored = self._load()
+                stored[key] = fingerprint
+                self._save(stored)
+    
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return dict(json.load(f))
+        except (IOError, OSError, ValueError, TypeError):
+            return {}
+    
+    def _save(self, fingerprints):
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                return
+        write_json(self.path, fingerprints)
+
+
+KEY_MEMORY = AgentKeyMemory()
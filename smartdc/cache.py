@@ -0,0 +1,261 @@
+import os
+import copy
+import json
+import time
+import errno
+import threading
+
+__all__ = ['ResponseCache', 'DiskCache', 'DEFAULT_CACHE_DIR']
+
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'smartdc')
+
+
+def write_json(filename, value):
+    """
+    :param filename: where to save `value`
+    :type filename: :py:class:`basestring`
+    
+    :Returns: whether `value` was written
+    :rtype: :py:class:`bool`
+    
+    Save `value` as JSON to a temporary file beside `filename` and rename it 
+    into place, so that readers in other processes see either the old or 
+    the new contents, never a partial file.
+    """
+    import tempfile
+    directory = os.path.dirname(filename) or '.'
+    try:
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    except (IOError, OSError):
+        return False
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f)
+        if os.name == 'nt' and os.path.exists(filename):
+            os.remove(filename)
+        os.rename(tmp, filename)
+        return True
+    except (IOError, OSError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+class ResponseCache(object):
+    """
+    A small in-memory cache of decoded responses for the mostly static
+    catalog endpoints (packages, datasets, images, networks, keys and
+    datacenters).
+    
+    Entries are fresh for `ttl` seconds. Once stale, an entry that carried
+    an ``ETag`` or ``Last-Modified`` header is revalidated with a conditional
+    request, so that a ``304 Not Modified`` response renews it without
+    transferring the body again. The cache is safe to share between threads
+    and between DataCenters, as entries are keyed by full URL and account.
+    """
+    def __init__(self, ttl=300):
+        """
+        :param ttl: seconds for which a response is served without asking
+            the server
+        :type ttl: :py:class:`float`
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} entries, ttl={ttl}>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            n=len(self._entries), ttl=self.ttl)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    @staticmethod
+    def key(url, params=None, account=None):
+        """
+        :param account: whose response this is, for URLs that do not say
+            (as with the ``my`` login)
+        :type account: :py:class:`basestring`
+        
+        :Returns: a hashable key for a GET of `url` with query `params`
+        """
+        if params:
+            return (url, tuple(sorted(params.items())), account)
+        return (url, (), account)
+    
+    def lookup(self, key):
+        """
+        :Returns: a tuple of the cached value (or ``None``) and the headers
+            with which to revalidate a stale entry
+        :rtype: :py:class:`tuple`
+        
+        A fresh entry counts as a hit, anything else as a miss.
+        """
+        with self._lock:
+            entry = self._get(key)
+            if entry is None:
+                self.misses += 1
+                return None, {}
+            value, expires, etag, last_modified = entry
+            if time.time() < expires:
+                self.hits += 1
+                return copy.deepcopy(value), {}
+            self.misses += 1
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return None, headers
+    
+    def store(self, key, value, resp):
+        """
+        Save a decoded response `value` along with the validators from the
+        `resp` headers.
+        """
+        etag = resp.headers.get('etag')
+        last_modified = resp.headers.get('last-modified')
+        with self._lock:
+            self._put(key, (copy.deepcopy(value), time.time() + self.ttl,
+                etag, last_modified))
+    
+    def renew(self, key):
+        """
+        :Returns: the cached value after a ``304 Not Modified`` response,
+            renewing its lifetime, or ``None`` if it has since been 
+            invalidated
+        """
+        with self._lock:
+            entry = self._get(key)
+            if entry is None:
+                return None
+            value, _, etag, last_modified = entry
+            self._put(key, (value, time.time() + self.ttl, etag,
+                last_modified))
+            self.revalidations += 1
+        return copy.deepcopy(value)
+    
+    def _get(self, key):
+        return self._entries.get(key)
+    
+    def _put(self, key, entry):
+        self._entries[key] = entry
+    
+    def invalidate(self, path=None):
+        """
+        :param path: drop only the entries whose URL contains this path
+            (e.g. ``'/packages'``)
+        :type path: :py:class:`basestring`
+        
+        Drop cached entries, all of them by default.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if path in k[0]]:
+                    del self._entries[key]
+    
+    def stats(self):
+        """
+        :Returns: hit, miss and revalidation counters, and the entry count
+        :rtype: :py:class:`dict`
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'revalidations': self.revalidations,
+                'entries': len(self._entries)}
+
+
+class DiskCache(ResponseCache):
+    """
+    A :py:class:`smartdc.cache.ResponseCache` backed by a directory of JSON 
+    files, so that short-lived processes (cron jobs, CLI invocations) can 
+    share catalog listings instead of each fetching them on start-up.
+    
+    Each entry is a file named for a hash of its full URL (which includes 
+    the base URL and login), query and account. Files are written with 
+    :py:func:`smartdc.cache.write_json`, so concurrent readers in other 
+    processes see either the old or the new entry, never a partial one; 
+    unreadable files are treated as misses. Entries read from disk are also kept in memory.
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=300):
+        """
+        :param directory: where to keep the cache files (created if missing)
+        :type directory: :py:class:`basestring`
+        
+        :param ttl: seconds for which a response is served without asking
+            the server
+        :type ttl: :py:class:`float`
+        """
+        super(DiskCache, self).__init__(ttl=ttl)
+        self.directory = os.path.expanduser(directory)
+        try:
+            os.makedirs(self.directory, 0o700)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {dir}, ttl={ttl}>'.format(
+            module=self.__module__, cls=self.__class__.__name__, 
+            dir=self.directory, ttl=self.ttl)
+    
+    def _filename(self, key):
+        import hashlib
+        digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+    
+    def _read(self, filename):
+        try:
+            with open(filename) as f:
+                d = json.load(f)
+            return (d['value'], d['expires'], d.get('etag'), 
+                    d.get('last_modified'), d['url'])
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            stored = self._read(self._filename(key))
+            if stored is not None and (entry is None or stored[1] > entry[1]):
+                entry = stored[:4]
+                self._entries[key] = entry
+        return entry
+    
+    def _put(self, key, entry):
+        self._entries[key] = entry
+        value, expires, etag, last_modified = entry
+        write_json(self._filename(key), {'url': key[0], 'params': key[1], 
+            'account': key[2], 'value': value, 'expires': expires, 
+            'etag': etag, 'last_modified': last_modified})
+    
+    def invalidate(self, path=None):
+        """
+        :param path: drop only the entries whose URL contains this path
+            (e.g. ``'/packages'``)
+        :type path: :py:class:`basestring`
+        
+        Drop cached entries, all of them by default, both in memory and on 
+        disk.
+        """
+        super(DiskCache, self).invalidate(path)
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                filename = os.path.join(self.directory, name)
+                if path is not None:
+                    stored = self._read(filename)
+                    if stored is not None and path not in stored[4]:
+                        continue
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
@@ -0,0 +1,149 @@
+import json
+import codecs
+import threading
+
+__all__ = ['json_decoder', 'iter_json_array', 'BACKENDS']
+
+BACKENDS = ('orjson', 'ujson', 'simplejson', 'json')
+"""JSON libraries tried by :py:func:`json_decoder`, fastest first"""
+
+_WHITESPACE = ' \t\n\r'
+
+_detected = None
+_detect_lock = threading.Lock()
+
+
+def _stdlib_loads(s):
+    # json.loads only accepts bytes from Python 3.6
+    if isinstance(s, bytes) and not isinstance(s, str):
+        s = s.decode('utf-8')
+    return json.loads(s)
+
+
+def _import_loads(name):
+    if name == 'json':
+        return _stdlib_loads
+    # orjson, ujson and simplejson all accept bytes
+    return __import__(name).loads
+
+
+def json_decoder(name=None):
+    """
+    :param name: one of :py:data:`BACKENDS`, or ``None`` to use the fastest
+        one installed
+    :type name: :py:class:`basestring`
+    
+    :Returns: the backend's name and its ``loads`` function
+    :rtype: :py:class:`tuple`
+    :raises: :py:class:`ImportError` if the named library is not installed
+    
+    The libraries are only imported when a backend is first asked for, and
+    the automatic choice is made once per process.
+    """
+    global _detected
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError('Unknown JSON backend: {0}'.format(name))
+        return name, _import_loads(name)
+    with _detect_lock:
+        if _detected is None:
+            for candidate in BACKENDS:
+                try:
+                    _detected = (candidate, _import_loads(candidate))
+                    break
+                except ImportError:
+                    continue
+        return _detected
+
+
+def iter_json_array(chunks):
+    """
+    :param chunks: the body of a response, in pieces (e.g.
+        ``response.iter_content(65536)``)
+    :type chunks: iterable of :py:class:`bytes`
+    
+    :rtype: generator
+    :raises: :py:class:`ValueError` if the body is not a JSON array
+    
+    Incrementally parse a JSON array, yielding each element as soon as it
+    has arrived in full. Only the unparsed tail of the body is buffered, so
+    peak memory is bounded by the largest element rather than the whole
+    array. After the closing bracket, the rest of `chunks` is read through,
+    so that a generator feeding them runs to completion.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    exhausted = False
+    
+    def more():
+        try:
+            return text.decode(next(chunks))
+        except StopIteration:
+            return None
+    
+    def skip(buf, pos):
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+    
+    # opening bracket
+    while True:
+        pos = skip(buf, pos)
+        if pos < len(buf):
+            break
+        piece = more()
+        if piece is None:
+            raise ValueError('Empty body where a JSON array was expected')
+        buf, pos = buf[pos:] + piece, 0
+    if buf[pos] != '[':
+        raise ValueError('Expected a JSON array')
+    pos += 1
+    # after '[' a value or ']' may follow, after a value ',' or ']', and 
+    # after ',' only a value
+    after_value = after_comma = False
+    while True:
+        pos = skip(buf, pos)
+        if pos < len(buf):
+            c = buf[pos]
+            if c == ']':
+                if after_comma:
+                    raise ValueError('Unexpected "]" after "," in JSON '
+                        'array at offset {0}'.format(pos))
+                for _ in chunks:
+                    pass
+                return
+            if after_value:
+                if c != ',':
+                    raise ValueError('Expected "," or "]" in JSON array '
+                        'at offset {0}'.format(pos))
+                pos += 1
+                after_value, after_comma = False, True
+                continue
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                end = None
+            # a value is only complete once a delimiter follows it, as a 
+            # number cut short by a chunk boundary (``15.`` of ``15.25``) 
+            # still decodes
+            if end is not None and not exhausted:
+                after = skip(buf, end)
+                if buf[after:after + 1] not in (',', ']'):
+                    end = None
+            if end is not None:
+                yield value
+                pos = end
+                after_value, after_comma = True, False
+                if pos > 65536:
+                    buf, pos = buf[pos:], 0
+                continue
+        if exhausted:
+            raise ValueError('Truncated JSON array')
+        piece = more()
+        if piece is None:
+            exhausted = True
+        else:
+            buf, pos = buf[pos:] + piece, 0
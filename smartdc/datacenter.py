@@ -3,17 +3,27 @@ import sys
 import json
 from operator import itemgetter
 import re
+import time
 from datetime import datetime
-from exceptions import FutureWarning
+import threading
 from warnings import warn
 
-import requests
-from http_signature.requests_auth import HTTPSignatureAuth
-
+from . import __version__
 from .machine import Machine
-from ._version import get_versions
-__version__ = get_versions()['version']
-del get_versions
+from .fleet import bulk_action, wait_for_state
+from .metrics import RequestMetrics
+from .codec import json_decoder, iter_json_array
+from .inventory import MachineInventory
+from .deadline import Deadline, DeadlineExceeded, current_deadline, propagate
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter, rate_limiter
+from .cache import ResponseCache, DiskCache
+from .auth import (signature_auth, agent_fingerprint, order_agent_keys, 
+    AgentKeyMemory, KEY_MEMORY)
+try:
+    basestring
+except NameError:
+    basestring = str
 
 __all__ = ['DataCenter', 'KNOWN_LOCATIONS', 
             'TELEFONICA_LOCATIONS', 'DEFAULT_LOCATION']
@@ -38,6 +48,11 @@ TELEFONICA_LOCATIONS = {
 
 DEFAULT_LOCATION = 'us-west-1'
 
+STREAM_CHUNK_SIZE = 65536
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
 DEFAULT_HEADERS = {
     'Accept':        'application/json',
     'Content-Type':  'application/json; charset=UTF-8',
@@ -69,6 +84,17 @@ def search_dicts(dicts, predicate, fields):
             continue
 
 
+def _transient_errors():
+    """
+    :Returns: the :py:mod:`requests` exceptions for failures that may pass 
+        on retrying: connection errors (including resets), timeouts and 
+        connections dropped mid-response
+    """
+    import requests
+    return (requests.ConnectionError, requests.Timeout, 
+        requests.exceptions.ChunkedEncodingError)
+
+
 class DataCenter(object):
     """
     Basic connection object that makes all API requests.
@@ -83,7 +109,13 @@ class DataCenter(object):
     
     def __init__(self, location=None, key_id=None, secret='~/.ssh/id_rsa', 
                 headers=None, login=None, known_locations=None,
-                allow_agent=False, verify=True, verbose=None):
+                allow_agent=False, verify=True, verbose=None, session=None,
+                pool_connections=10, pool_maxsize=10, keep_alive=True,
+                cache_ttl=None, cache_dir=None, key_memory=None, 
+                json_backend=None, compress=None, 
+                connect_timeout=DEFAULT_CONNECT_TIMEOUT, 
+                read_timeout=DEFAULT_READ_TIMEOUT, retry=None, 
+                rate_limit=None, adaptive_concurrency=None):
         """
         A :py:class:`smartdc.datacenter.DataCenter` object may be instantiated 
         without any parameters, but practically speaking, the `key_id` and 
@@ -117,6 +149,64 @@ class DataCenter(object):
         :param verbose: whether or not to print request URLs to stderr, overrides config
         :type verbose: :py:class:`bool`
         
+        :param session: an existing connection pool to share
+        :type session: :py:class:`requests.Session`
+        
+        :param pool_connections: number of per-host connection pools to cache
+        :type pool_connections: :py:class:`int`
+        
+        :param pool_maxsize: maximum number of connections kept open per host
+        :type pool_maxsize: :py:class:`int`
+        
+        :param keep_alive: whether or not to reuse connections across requests
+        :type keep_alive: :py:class:`bool`
+        
+        :param cache_ttl: seconds to cache catalog listings for (default: no 
+            caching)
+        :type cache_ttl: :py:class:`float`
+        
+        :param cache_dir: directory in which to persist the catalog cache 
+            across processes (e.g. ``smartdc.cache.DEFAULT_CACHE_DIR``)
+        :type cache_dir: :py:class:`basestring`
+        
+        :param key_memory: where to remember the working ssh-agent key: a file 
+            path, or an :py:class:`smartdc.auth.AgentKeyMemory` (default: in 
+            memory for this process)
+        :type key_memory: :py:class:`basestring` or 
+            :py:class:`smartdc.auth.AgentKeyMemory`
+        
+        :param json_backend: JSON library with which to decode responses, 
+            one of ``smartdc.codec.BACKENDS`` (default: the fastest 
+            installed)
+        :type json_backend: :py:class:`basestring`
+        
+        :param compress: ``True`` to ask for gzip or deflate compressed 
+            responses, ``False`` to ask for uncompressed ones, or ``None`` to 
+            leave the ``Accept-Encoding`` header of the HTTP library as is
+        :type compress: :py:class:`bool`
+        
+        :param connect_timeout: seconds to wait for a connection to the 
+            server (``None`` waits forever)
+        :type connect_timeout: :py:class:`float`
+        
+        :param read_timeout: seconds to wait for the server between bytes of 
+            a response (``None`` waits forever)
+        :type read_timeout: :py:class:`float`
+        
+        :param retry: when to send failed requests again (default: a 
+            :py:class:`smartdc.retry.RetryPolicy` with its defaults; 
+            ``False`` never retries)
+        :type retry: :py:class:`smartdc.retry.RetryPolicy`
+        
+        :param rate_limit: requests per second allowed to this endpoint, or 
+            a :py:class:`smartdc.ratelimit.RateLimiter` to use
+        :type rate_limit: :py:class:`float` or 
+            :py:class:`smartdc.ratelimit.RateLimiter`
+        
+        :param adaptive_concurrency: maximum requests in flight to this 
+            endpoint, adapted down on throttling and back up on success
+        :type adaptive_concurrency: :py:class:`int`
+        
         The `location` is notionally a hostname, but it may be 
         expressed as an FQDN, one of the keys to the `known_locations` dict, 
         or, as a fallback, a bare hostname as prefix to the API_HOST_SUFFIX.
@@ -126,6 +216,71 @@ class DataCenter(object):
         The `known_locations` dict allows for custom access to a private 
         cloud.
         
+        All requests go through a persistent :py:class:`requests.Session`, so 
+        that TCP connections and TLS sessions are reused between calls. The 
+        session is shared with any DataCenter returned by 
+        :py:meth:`datacenter`, and it may be released with :py:meth:`close` or 
+        by using the DataCenter as a context manager.
+        
+        With a `cache_ttl`, the catalog listings (:py:meth:`keys`, 
+        :py:meth:`datacenters`, :py:meth:`datasets`, :py:meth:`packages`, 
+        :py:meth:`images` and :py:meth:`networks`) are kept in a 
+        :py:class:`smartdc.cache.ResponseCache` on the `cache` attribute, 
+        which records hits and misses and may be cleared with its 
+        ``invalidate()`` method. Adding a `cache_dir` makes it a 
+        :py:class:`smartdc.cache.DiskCache`, shared by every process using 
+        that directory, with a default TTL of 5 minutes.
+        
+        Request signatures are computed by a 
+        :py:class:`smartdc.auth.CachedSignatureAuth`, which reuses the 
+        signature of the ``Date`` header for all requests made within the same 
+        second. It is shared by every DataCenter in the process using the same 
+        credentials, so an ssh-agent connection is opened only once. When a 
+        request with an agent key is refused, the other agent keys are tried 
+        (once each), and the key that works is remembered for this location 
+        and login in the `key_memory`.
+        
+        Every request is recorded in the `metrics` attribute, a 
+        :py:class:`smartdc.metrics.RequestMetrics`. Further telemetry may be 
+        attached through the `hooks` attribute: callables appended to 
+        ``hooks['before_request']`` are called as ``hook(method, path, 
+        headers)`` before each request is sent (and may modify the headers), 
+        and those in ``hooks['after_request']`` as ``hook(method, path, 
+        response, elapsed)`` once it completes, with a `response` of ``None`` 
+        if it raised an exception.
+        
+        Response bodies are decoded with the fastest JSON library available 
+        (``orjson``, ``ujson`` or ``simplejson``, falling back to the standard 
+        library), as named by the `json_backend` attribute. With `compress`, 
+        responses may arrive gzip or deflate encoded and are decompressed 
+        transparently; with ``compress=False`` only uncompressed responses 
+        are accepted. 
+        The `metrics` count response bytes both as decoded and as 
+        transferred, to measure the savings per endpoint.
+        
+        Every request is bounded by the `connect_timeout` and `read_timeout`, 
+        which :py:meth:`request` accepts a `timeout` to override. A 
+        :py:class:`smartdc.deadline.Deadline` (also available as 
+        :py:meth:`deadline`) bounds a sequence of calls as a whole: while it 
+        is active on a thread, the timeouts of that thread's requests are cut 
+        down to the time remaining, poll loops do not sleep past it, and 
+        :py:class:`smartdc.deadline.DeadlineExceeded` is raised once it has 
+        passed.
+        
+        Requests failing with a connection error, a timeout, a 429 or a 
+        transient 5xx status are retried with exponential backoff and jitter 
+        according to the `retry` policy: by default up to 3 times, for 
+        idempotent verbs only (and for every verb on a 429), honoring any 
+        ``Retry-After`` header. Each retry is counted in the `metrics`.
+        
+        With a `rate_limit` or `adaptive_concurrency`, requests are paced by 
+        the `limiter` attribute, a :py:class:`smartdc.ratelimit.RateLimiter` 
+        shared by all threads and all DataCenters in the process with the 
+        same base URL and login (including those from :py:meth:`datacenter`): 
+        a token bucket keeps the sustained request rate under `rate_limit`, 
+        and the number of requests in flight is cut on every burst of 429 or 
+        503 responses and grown back while requests succeed.
+        
         Attributes:
         
         :var location: location of the machine
@@ -138,8 +293,7 @@ class DataCenter(object):
         self.verbose = verbose and sys.stderr
         self.verify = verify
         if key_id and secret:
-            self.auth = HTTPSignatureAuth(key_id=key_id, secret=secret,
-                allow_agent=allow_agent)
+            self.auth = signature_auth(key_id, secret, allow_agent)
         else:
             self.auth = None
         self.default_headers = DEFAULT_HEADERS
@@ -150,6 +304,93 @@ class DataCenter(object):
             self.login = login
         else:
             self.login = 'my'
+        self.keep_alive = keep_alive
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._session = session
+        self._session_lock = threading.Lock()
+        if isinstance(key_memory, AgentKeyMemory):
+            self.key_memory = key_memory
+        elif key_memory:
+            self.key_memory = AgentKeyMemory(key_memory)
+        else:
+            self.key_memory = KEY_MEMORY
+        if cache_dir:
+            self.cache = DiskCache(cache_dir, ttl=cache_ttl or 300)
+        elif cache_ttl:
+            self.cache = ResponseCache(ttl=cache_ttl)
+        else:
+            self.cache = None
+        self.metrics = RequestMetrics()
+        self.hooks = {'before_request': [], 'after_request': []}
+        self.json_backend, self.json_loads = json_decoder(json_backend)
+        self.compress = compress
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        if retry is None:
+            retry = RetryPolicy()
+        self.retry = retry
+        self.rate_limit = rate_limit
+        self.adaptive_concurrency = adaptive_concurrency
+        if isinstance(rate_limit, RateLimiter):
+            self.limiter = rate_limit
+        elif rate_limit or adaptive_concurrency:
+            self.limiter = rate_limiter(self.base_url, self.login, 
+                rate=rate_limit, concurrency=adaptive_concurrency, 
+                adaptive=bool(adaptive_concurrency))
+        else:
+            self.limiter = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def deadline(timeout):
+        """
+        :param timeout: seconds allowed for the calls made within the block
+        :type timeout: :py:class:`float`
+        
+        :rtype: :py:class:`smartdc.deadline.Deadline`
+        
+        A context manager within which the current thread's requests, 
+        together, must finish in `timeout` seconds::
+        
+            with dc.deadline(30):
+                machines = dc.machines()
+        """
+        return Deadline(timeout)
+    
+    def close(self):
+        """
+        Close the pooled connections held by this DataCenter. As the pool is 
+        shared, this also affects DataCenters cloned via :py:meth:`datacenter`, 
+        although the session transparently reconnects if it is used again.
+        """
+        if self._session is not None:
+            self._session.close()
+    
+    @property
+    def session(self):
+        """
+        The pooled :py:class:`requests.Session`, created (and `requests` 
+        imported) on first use.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections, 
+                        pool_maxsize=self.pool_maxsize)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
     
     def __str__(self):
         """
@@ -223,8 +464,7 @@ class DataCenter(object):
         authenticate with a `key_id` and `secret`.
         """
         if key_id and secret:
-            self.auth = HTTPSignatureAuth(key_id=key_id, secret=secret, 
-                allow_agent=allow_agent)
+            self.auth = signature_auth(key_id, secret, allow_agent)
     
     def request(self, method, path, headers=None, data=None, **kwargs):
         """
@@ -239,41 +479,256 @@ class DataCenter(object):
         :param headers: additional headers to send
         :type headers: :py:class:`dict`
         
+        :param timeout: seconds, or a ``(connect, read)`` tuple, overriding 
+            the DataCenter's `connect_timeout` and `read_timeout`
+        :type timeout: :py:class:`float` or :py:class:`tuple`
+        
+        :param retry: policy overriding the DataCenter's `retry` for this 
+            request (``False`` to not retry)
+        :type retry: :py:class:`smartdc.retry.RetryPolicy`
+        
         :Returns: tuple of decoded response body & `Response` object
-        :raises: client (4xx) errors
+        :raises: client (4xx) and server (5xx) errors left once retries are 
+            exhausted, and :py:class:`smartdc.deadline.DeadlineExceeded` if 
+            the active deadline passes first
+        
+        With ``stream=True``, a JSON array body is not read up front: the 
+        decoded body is instead a generator of the array's elements, parsed 
+        as they arrive.
         """
+        stream = kwargs.get('stream')
+        timeout = kwargs.pop('timeout', None)
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        retry = kwargs.pop('retry', None)
+        if retry is None:
+            retry = self.retry
+        attempt = 0
+        deadline = current_deadline()
         full_path = self.url + path
-        request_headers = {}
-        request_headers.update(self.default_headers)
-        if headers:
-            request_headers.update(headers)
+        request_headers = self._request_headers(headers)
         jdata = None
         if data:
             jdata = json.dumps(data)
+        for hook in self.hooks['before_request']:
+            hook(method, path, request_headers)
         if self.verbose:
             print("%s\t%s\t%s" % 
                 (datetime.now().isoformat(), method, full_path), 
                 file=self.verbose)
-        resp = requests.request(method, full_path, auth=self.auth, 
-            headers=request_headers, data=jdata,
-            verify=self.verify, **kwargs)
-        if (resp.status_code == 401 and self.auth and 
-                self.auth.signer._agent_key):
-            self.auth.signer.swap_keys()
-            return self.request(method, path, headers=headers, data=data,
-                **kwargs)
-        if 400 <= resp.status_code < 499:
+        agent_keys = self._agent_keys()
+        agent_key = agent_keys.pop(0) if agent_keys else None
+        auth = self._timed_auth(agent_key)
+        start = time.time()
+        while True:
+            try:
+                resp = self._send(method, full_path, deadline, auth=auth, 
+                    headers=request_headers, data=jdata, timeout=timeout, 
+                    verify=self.verify, **kwargs)
+            except DeadlineExceeded:
+                raise
+            except _transient_errors():
+                pause = retry.wait(attempt, method, 
+                    deadline=deadline) if retry else None
+                if pause is None:
+                    self._record(method, path, None, time.time() - start, 
+                        jdata)
+                    if deadline is not None and deadline.expired():
+                        raise DeadlineExceeded('{0} {1} ran past its '
+                            'deadline'.format(method, path))
+                    raise
+            except Exception:
+                self._record(method, path, None, time.time() - start, jdata)
+                raise
+            else:
+                if resp.status_code == 401 and agent_keys:
+                    # try the agent's other keys for this request only
+                    agent_key = agent_keys.pop(0)
+                    auth = self._timed_auth(agent_key)
+                    self.metrics.record_retry(method, path)
+                    continue
+                pause = retry.wait(attempt, method, resp.status_code, 
+                    resp.headers, deadline) if retry else None
+                if pause is None:
+                    break
+                resp.close()
+            attempt += 1
+            self.metrics.record_retry(method, path)
+            time.sleep(pause)
+        self._record(method, path, resp, time.time() - start, jdata, 
+            None if stream else resp.content)
+        if agent_key is not None and resp.status_code != 401:
+            self._remember_agent_key(agent_key)
+        if resp.status_code >= 400:
             if resp.content:
                 print(resp.content, file=sys.stderr)
             resp.raise_for_status()
+        if stream and resp.headers.get('content-type') == 'application/json':
+            return (iter_json_array(self._stream_body(method, path, resp)), 
+                resp)
         if resp.content:
             if resp.headers['content-type'] == 'application/json':
-                return (json.loads(resp.content), resp)
+                return (self.json_loads(resp.content), resp)
             else:
                 return (resp.content, resp)
         else:
             return (None, resp)
     
+    def _send(self, method, url, deadline=None, **kwargs):
+        """
+        Send a single request through the `limiter`, if any, with its timeout 
+        cut down to the time left before the `deadline`.
+        """
+        limiter = self.limiter
+        ticket = limiter.acquire(deadline) if limiter is not None else None
+        status = None
+        try:
+            if deadline is not None:
+                kwargs['timeout'] = deadline.clamp(kwargs.get('timeout'))
+            resp = self.session.request(method, url, **kwargs)
+            status = resp.status_code
+            return resp
+        finally:
+            if limiter is not None:
+                limiter.release(ticket, status)
+    
+    def _stream_body(self, method, path, resp):
+        """
+        Yield the body of a streamed response in chunks, counting its bytes 
+        into `metrics` once it has been read, or once the reader gives up on 
+        it.
+        """
+        received = 0
+        try:
+            for chunk in resp.iter_content(STREAM_CHUNK_SIZE):
+                received += len(chunk)
+                yield chunk
+        finally:
+            self.metrics.record_received(method, path, received, 
+                self._wire_size(resp, received))
+    
+    def _timed_auth(self, agent_key=None):
+        """
+        :Returns: a wrapper for `auth` that signs with `agent_key`, if given, 
+            and records the time spent signing
+        """
+        auth, metrics = self.auth, self.metrics
+        if auth is None:
+            return None
+        def sign(r):
+            start = time.time()
+            if agent_key is None:
+                auth(r)
+            else:
+                auth(r, agent_key)
+            metrics.record_signing(time.time() - start)
+            return r
+        return sign
+    
+    def _record(self, method, path, resp, elapsed, sent=None, received=None, 
+            status=None):
+        """
+        Record a completed request in `metrics` and call the 
+        ``after_request`` hooks.
+        """
+        if status is None:
+            status = resp.status_code if resp is not None else 'error'
+        size = len(received) if received else 0
+        self.metrics.record(method, path, status, elapsed, 
+            sent=len(sent) if sent else 0, received=size, 
+            wire=self._wire_size(resp, size) if size else 0)
+        for hook in self.hooks['after_request']:
+            hook(method, path, resp, elapsed)
+    
+    @staticmethod
+    def _wire_size(resp, size):
+        """
+        :Returns: the number of body bytes transferred for a response whose 
+            decoded body is `size` bytes long
+        """
+        if resp.headers.get('content-encoding', 'identity') == 'identity':
+            return size
+        try:
+            # bytes read off the socket, before decompression
+            return resp.raw.tell()
+        except AttributeError:
+            pass
+        try:
+            return int(resp.headers['content-length'])
+        except (KeyError, ValueError):
+            return size
+    
+    def _agent_keys(self):
+        """
+        :Returns: the ssh-agent keys to sign a request with, in the order to 
+            try them, starting with the key remembered for this datacenter 
+            (empty if requests are not signed with an agent key)
+        """
+        keys = getattr(self.auth, 'agent_keys', None)
+        if not keys:
+            return []
+        return order_agent_keys(keys, 
+            self.key_memory.get(self.base_url, self.login))
+    
+    def _remember_agent_key(self, agent_key):
+        self.key_memory.remember(self.base_url, self.login, 
+            agent_fingerprint(agent_key))
+    
+    def _request_headers(self, headers=None):
+        """
+        Merge the default headers with any per-request `headers`.
+        """
+        request_headers = {}
+        request_headers.update(self.default_headers)
+        if self.compress:
+            request_headers['Accept-Encoding'] = 'gzip, deflate'
+        elif self.compress is False:
+            request_headers['Accept-Encoding'] = 'identity'
+        if headers:
+            request_headers.update(headers)
+        if not self.keep_alive:
+            request_headers['Connection'] = 'close'
+        return request_headers
+    
+    def _catalog(self, path, params=None):
+        """
+        GET a catalog listing, going through the response cache if there is 
+        one and revalidating stale entries with a conditional request.
+        """
+        if self.cache is None:
+            j, _ = self.request('GET', path, params=params)
+            return j
+        key = self._cache_key(path, params)
+        j, headers = self.cache.lookup(key)
+        if j is not None:
+            return j
+        j, r = self.request('GET', path, params=params, headers=headers)
+        if r.status_code == 304:
+            j = self.cache.renew(key)
+            if j is not None:
+                return j
+            j, r = self.request('GET', path, params=params)
+        self.cache.store(key, j, r)
+        return j
+    
+    def _cache_key(self, path, params=None):
+        """
+        Key a catalog response by URL, query and account: with the ``my`` 
+        login, the URL alone does not say whose catalog it is, so the key 
+        id (which names the account) stands in for it.
+        """
+        account = self.login
+        if account == 'my' and self.auth is not None:
+            account = self.auth.key_id
+        return self.cache.key(self.url + path, params, account)
+    
+    def _invalidate(self, path):
+        """
+        Drop cached catalog entries for `path` after a change to them.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self.url + path)
+    
     @deprecated
     def api(self):
         """
@@ -292,7 +747,7 @@ class DataCenter(object):
             print("%s\t%s\t%s" % 
                 (datetime.now().isoformat(), 'GET', self.base_url), 
                 file=self.verbose)
-        resp = requests.request('GET', self.base_url, verify=self.verify)
+        resp = self.session.request('GET', self.base_url, verify=self.verify)
         if 400 <= resp.status_code < 499:
             resp.raise_for_status()
         if resp.content:
@@ -391,8 +846,7 @@ class DataCenter(object):
         :Returns: all public keys on record for the authenticated account.
         :rtype: :py:class:`list` of :py:class:`dict`\s
         """
-        j, _ = self.request('GET', '/keys')
-        return j
+        return self._catalog('/keys')
     
     def key(self, key_id):
         """
@@ -425,6 +879,7 @@ class DataCenter(object):
         """
         data = {'name': str(key_id), 'key': str(key)}
         j, _ = self.request('POST', '/keys', data=data)
+        self._invalidate('/keys')
         return j
     
     def delete_key(self, key_id):
@@ -440,6 +895,7 @@ class DataCenter(object):
         """
         j, r = self.request('DELETE', '/keys/' + str(key_id))
         r.raise_for_status()
+        self._invalidate('/keys')
         return j
     
     def datacenters(self):
@@ -455,7 +911,7 @@ class DataCenter(object):
         This method also updates the local `known_locations` attribute based 
         upon this information.
         """
-        j, _ = self.request('GET', '/datacenters')
+        j = self._catalog('/datacenters')
         self.known_locations.update(j)
         return j
     
@@ -476,8 +932,17 @@ class DataCenter(object):
             self.datacenters()
         dc = DataCenter(location=name, headers=self.default_headers, 
                 login=self.login, verbose=self.verbose, 
-                verify=self.verify, known_locations=self.known_locations)
+                verify=self.verify, known_locations=self.known_locations,
+                session=self.session, keep_alive=self.keep_alive, 
+                json_backend=self.json_backend, compress=self.compress, 
+                connect_timeout=self.connect_timeout, 
+                read_timeout=self.read_timeout, retry=self.retry, 
+                rate_limit=self.rate_limit, 
+                adaptive_concurrency=self.adaptive_concurrency)
         dc.auth = self.auth
+        dc.cache = self.cache
+        dc.key_memory = self.key_memory
+        dc.hooks = self.hooks
         return dc
     
     def datasets(self, search=None, fields=('description', 'urn')):
@@ -499,7 +964,7 @@ class DataCenter(object):
             datacenter 
         :rtype: :py:class:`list` of :py:class:`dict`\s
         """
-        j, _ = self.request('GET', '/datasets')
+        j = self._catalog('/datasets')
         if search:
             return list(search_dicts(j, search, fields))
         else:
@@ -524,7 +989,7 @@ class DataCenter(object):
             identifier = identifier.get('id', identifier['urn'])
         j, _ = self.request('GET', '/datasets/' + str(identifier))
         return j
-
+    
     def packages(self, name=None, memory=None, disk=None, swap=None,
                 version=None, vcpus=None, group=None):
         """
@@ -572,8 +1037,7 @@ class DataCenter(object):
             params['vcpus'] = vcpus
         if group:
             params['group'] = group
-        j, _ = self.request('GET', '/packages', params=params)
-        return j
+        return self._catalog('/packages', params=params)
     
     def default_package(self):
         """
@@ -646,7 +1110,10 @@ class DataCenter(object):
             owned by the user at this datacenter
         :rtype: :py:class:`int`
         """
-        _, r = self.request('HEAD', '/machines')
+        params = self._machine_params(machine_type=machine_type, 
+            dataset=dataset, state=state, memory=memory, tombstone=tombstone, 
+            tags=tags)
+        _, r = self.request('HEAD', '/machines', params=params)
         num = r.headers.get('x-resource-count', 0)
         return int(num)
     
@@ -677,7 +1144,7 @@ class DataCenter(object):
     
     def machines(self, machine_type=None, name=None, dataset=None, state=None, 
             memory=None, tombstone=None, tags=None, credentials=False, 
-            paged=False, limit=None, offset=None):
+            paged=False, limit=None, offset=None, workers=1):
         """
         ::
         
@@ -722,11 +1189,141 @@ class DataCenter(object):
         :param offset: get the next `limit` of machines starting at this point
         :type offset: :py:class:`int`
         
+        :param workers: number of pages to fetch concurrently
+        :type workers: :py:class:`int`
+        
         :rtype: :py:class:`list` of :py:class:`smartdc.machine.Machine`\s
         
         The `limit` and `offset` are the REST API's raw paging mechanism. 
         Alternatively, one can let `paged` remain `False`, and let the method 
         call attempt to collect all of the machines in multiple calls.
+        
+        When collecting all machines, the first response's 
+        ``x-resource-count`` and ``x-query-limit`` headers determine the 
+        remaining pages. With `workers` greater than 1, those pages are 
+        requested concurrently over the shared connection pool, and the 
+        machines are still returned in the server's order. Requested one at a 
+        time, they stop at the first page shorter than the first, which ends 
+        the listing even if it has shrunk in the meantime.
+        """
+        params = self._machine_params(machine_type=machine_type, name=name, 
+            dataset=dataset, state=state, memory=memory, tombstone=tombstone, 
+            tags=tags, credentials=credentials)
+        if limit:
+            params['limit'] = limit
+        if offset:
+            params['offset'] = offset
+        else:
+            offset = 0
+        j, r = self.request('GET', '/machines', params=params)
+        machines = list(j)
+        if not paged:
+            offsets = self._remaining_offsets(r, offset, len(j))
+            if workers > 1 and len(offsets) > 1:
+                from multiprocessing.pool import ThreadPool
+                pool = ThreadPool(min(workers, len(offsets)))
+                try:
+                    pages = pool.map(propagate(
+                        lambda o: self._machine_page(params, o)), offsets)
+                finally:
+                    pool.close()
+                for page in pages:
+                    machines.extend(page)
+            else:
+                for o in offsets:
+                    page = self._machine_page(params, o)
+                    machines.extend(page)
+                    if len(page) < len(j):
+                        break
+        return [Machine(datacenter=self, data=m) for m in machines]
+    
+    def iter_machines(self, machine_type=None, name=None, dataset=None, 
+            state=None, memory=None, tombstone=None, tags=None, 
+            credentials=False, limit=None, offset=None, stream=False):
+        """
+        ::
+        
+            GET /:login/machines
+        
+        Generator counterpart to :py:meth:`machines`, accepting the same 
+        predicates. It requests one page at a time (of `limit` machines, or 
+        the server's default page size) and yields instantiated 
+        :py:class:`smartdc.machine.Machine` objects as each page arrives, so 
+        that only a single page is held in memory.
+        
+        :param limit: page size to request
+        :type limit: :py:class:`int`
+        
+        :param offset: start listing at this point
+        :type offset: :py:class:`int`
+        
+        :param stream: whether to parse each page incrementally, yielding 
+            every machine as soon as it has arrived rather than once the 
+            whole page has
+        :type stream: :py:class:`bool`
+        
+        :rtype: generator of :py:class:`smartdc.machine.Machine`\s
+        """
+        params = self._machine_params(machine_type=machine_type, name=name, 
+            dataset=dataset, state=state, memory=memory, tombstone=tombstone, 
+            tags=tags, credentials=credentials)
+        if limit:
+            params['limit'] = limit
+        if stream:
+            for m in self._streamed_machines(params, offset or 0):
+                yield Machine(datacenter=self, data=m)
+            return
+        for page in self._raw_machine_pages(params, offset or 0):
+            for m in page:
+                yield Machine(datacenter=self, data=m)
+    
+    def _raw_machine_pages(self, params, offset=0):
+        """
+        Sequentially yield pages of raw machine dicts matching `params` until 
+        the ``x-resource-count`` header is exhausted.
+        """
+        params = dict(params)
+        while True:
+            params['offset'] = offset
+            j, r = self.request('GET', '/machines', params=params)
+            if not j:
+                return
+            yield j
+            offset += len(j)
+            try:
+                if offset >= int(r.headers['x-resource-count']):
+                    return
+            except (KeyError, ValueError):
+                return
+    
+    def _streamed_machines(self, params, offset=0):
+        """
+        Streaming counterpart to :py:meth:`_raw_machine_pages`, yielding 
+        raw machine dicts one at a time as each page is parsed.
+        """
+        params = dict(params)
+        while True:
+            params['offset'] = offset
+            items, r = self.request('GET', '/machines', params=params, 
+                stream=True)
+            received = 0
+            for m in items or ():
+                received += 1
+                yield m
+            if not received:
+                return
+            offset += received
+            try:
+                if offset >= int(r.headers['x-resource-count']):
+                    return
+            except (KeyError, ValueError):
+                return
+    
+    def _machine_params(self, machine_type=None, name=None, dataset=None, 
+            state=None, memory=None, tombstone=None, tags=None, 
+            credentials=False):
+        """
+        Translate :py:meth:`machines` predicates into query parameters.
         """
         params = {}
         if machine_type:
@@ -748,29 +1345,30 @@ class DataCenter(object):
                 params['tag.' + str(k)] = v
         if credentials:
             params['credentials'] = True
-        if limit:
-            params['limit'] = limit
-        else:
-            limit = 1000
-        if offset:
-            params['offset'] = offset
-        else:
-            offset = 0
-        machines = []
-        while True:
-            j, r = self.request('GET', '/machines', params=params)
-            machines.extend(j)
-            if not paged:
-                query_limit = int(r.headers['x-query-limit'])
-                resource_count = int(r.headers['x-resource-count'])
-                if resource_count > query_limit:
-                    data['offset'] = (params.get('offset', offset) + 
-                                      params.get('limit', limit)    )
-                else:
-                    break
-            else:
-                break
-        return [Machine(datacenter=self, data=m) for m in machines]
+        return params
+    
+    def _machine_page(self, params, offset):
+        """
+        Fetch the raw machine dicts for one page starting at `offset`.
+        """
+        page_params = dict(params, offset=offset)
+        j, _ = self.request('GET', '/machines', params=page_params)
+        return j or []
+    
+    @staticmethod
+    def _remaining_offsets(resp, offset, received):
+        """
+        Work out the offsets of the pages following the first one from the 
+        paging headers of its response.
+        """
+        try:
+            query_limit = int(resp.headers['x-query-limit'])
+            resource_count = int(resp.headers['x-resource-count'])
+        except (KeyError, ValueError):
+            return []
+        if not received or query_limit <= 0:
+            return []
+        return list(range(offset + received, resource_count, query_limit))
     
     def create_machine(self, name=None, package=None, dataset=None,
             metadata=None, tags=None, boot_script=None, credentials=False,
@@ -807,7 +1405,7 @@ class DataCenter(object):
         :param tags: keys & values with arbitrary supplementary 
             identifying information for filtering when querying for machines
         :type tags: :py:class:`dict`
-
+        
         :param networks: list of networks where this machine will belong to
         :type networks: :py:class:`list`
         
@@ -822,6 +1420,22 @@ class DataCenter(object):
         appears to resolve incomplete or ambiguous dataset URNs with the 
         highest version number.
         """
+        params = self._creation_params(name=name, package=package,
+            dataset=dataset, metadata=metadata, tags=tags,
+            boot_script=boot_script, image=image, networks=networks)
+        j, r = self.request('POST', '/machines', data=params)
+        if r.status_code >= 400:
+            print(j, file=sys.stderr)
+            r.raise_for_status()
+        return Machine(datacenter=self, data=j)
+    
+    def _creation_params(self, name=None, package=None, dataset=None,
+            metadata=None, tags=None, boot_script=None, image=None,
+            networks=None):
+        """
+        Translate :py:meth:`create_machine` arguments into the request
+        body.
+        """
         params = {}
         if name:
             assert re.match(r'[a-zA-Z0-9]([a-zA-Z0-9\-\.]*[a-zA-Z0-9])?$',
@@ -853,11 +1467,7 @@ class DataCenter(object):
                 params['networks'] = networks
             elif isinstance(networks, basestring):
                 params['networks'] = [networks]
-        j, r = self.request('POST', 'machines', data=params)
-        if r.status_code >= 400:
-            print(j, file=sys.stderr)
-            r.raise_for_status()
-        return Machine(datacenter=self, data=j)
+        return params
     
     def machine(self, machine_id, credentials=False):
         """
@@ -878,6 +1488,94 @@ class DataCenter(object):
         return Machine(datacenter=self, machine_id=machine_id, 
                 credentials=credentials)
     
+    def inventory(self, **kwargs):
+        """
+        ::
+        
+            GET /:login/machines
+        
+        :rtype: :py:class:`smartdc.inventory.MachineInventory`
+        
+        List the machines in this datacenter into an indexed inventory for 
+        fast lookups by id, name, state, dataset, image, package, IP or tag. 
+        Keyword arguments are passed on to :py:meth:`machines`.
+        """
+        return MachineInventory.from_datacenter(self, **kwargs)
+    
+    def bulk_action(self, machines, action, concurrency=10, **kwargs):
+        """
+        ::
+        
+            POST /:login/machines/:id?action=...
+        
+        :param machines: machines to act upon
+        :type machines: iterable of :py:class:`smartdc.machine.Machine`\s
+        
+        :param action: name of a :py:class:`smartdc.machine.Machine` method 
+            such as ``stop``, ``start``, ``reboot`` or ``delete``, or a 
+            callable accepting a machine
+        :type action: :py:class:`basestring` or callable
+        
+        :param concurrency: maximum number of requests in flight at once
+        :type concurrency: :py:class:`int`
+        
+        :rtype: :py:class:`smartdc.fleet.BulkResult`
+        
+        Run `action` against every machine on a bounded thread pool, sharing 
+        this DataCenter's connection pool. This returns immediately with a 
+        per-machine future for each call; use 
+        :py:meth:`smartdc.fleet.BulkResult.summary` to wait for completion and 
+        collect the failures. Remaining keyword arguments are passed on to 
+        each call (e.g. ``package`` for ``resize``).
+        """
+        return bulk_action(machines, action, concurrency=concurrency, 
+            **kwargs)
+    
+    def wait_for_state(self, machines, state, interval=2, timeout=None, 
+            callback=None, filtered=True, policy=None):
+        """
+        ::
+        
+            GET /:login/machines?state=:state
+        
+        :param machines: machines to watch
+        :type machines: iterable of :py:class:`smartdc.machine.Machine`\s
+        
+        :param state: target state
+        :type state: :py:class:`basestring`
+        
+        :param interval: initial pause in seconds between listings
+        :type interval: :py:class:`int`
+        
+        :param timeout: give up after this many seconds
+        :type timeout: :py:class:`float`
+        
+        :param callback: called with each machine as it reaches `state`
+        :type callback: callable
+        
+        :param filtered: whether to ask the server for only the machines in 
+            `state` on most ticks, rather than listing all machines
+        :type filtered: :py:class:`bool`
+        
+        :param policy: complete polling configuration, overriding `interval` 
+            and `timeout`
+        :type policy: :py:class:`smartdc.machine.PollPolicy`
+        
+        :Returns: the machines that reached `state`, those still pending, 
+            and those that ended in another terminal state (such as 
+            ``failed``) instead
+        :rtype: :py:class:`tuple` of three :py:class:`list`\s
+        
+        Fleet-wide counterpart to 
+        :py:meth:`smartdc.machine.Machine.poll_until`: rather than one request 
+        per machine per poll, each tick makes a single (paged) ``/machines`` 
+        listing and updates every watched machine found in it. See 
+        :py:func:`smartdc.fleet.wait_for_state`.
+        """
+        return wait_for_state(self, machines, state, interval=interval, 
+            timeout=timeout, callback=callback, filtered=filtered, 
+            policy=policy)
+    
     def networks(self, search=None, fields=('name,')):
         """
         ::
@@ -897,7 +1595,7 @@ class DataCenter(object):
         :rtype: :py:class:`list` of :py:class:`dict`\s
         """
         
-        j, _ = self.request('GET', '/networks')
+        j = self._catalog('/networks')
         if search:
             return list(search_dicts(j, search, fields))
         else:
@@ -948,8 +1646,8 @@ class DataCenter(object):
         :param owner: match on the owner UUID
         :type owner: :py:class:`basestring`
         
-        :param machinetype: match on the selected type (e.g., "smartmachine")
-        :type machinetype: :py:class:`basestring`
+        :param type: match on the selected type (e.g., "smartmachine")
+        :type type: :py:class:`basestring`
         
         :Returns: available machine images in this datacenter
         :rtype: :py:class:`list` of :py:class:`dict`\s
@@ -968,11 +1666,9 @@ class DataCenter(object):
             params['state'] = state
         if owner:
             params['owner'] = owner
-        if machinetype:
-            params['type'] = machinetype
-        j, _ = self.request('GET', '/images', params=params)
-        
-        return j
+        if type:
+            params['type'] = type
+        return self._catalog('/images', params=params)
     
     def image(self, identifier):
         """
@@ -1013,7 +1709,8 @@ class DataCenter(object):
             identifier = identifier.get('id', '')
         j, r = self.request('DELETE', '/images/' + str(identifier))
         r.raise_for_status()
+        self._invalidate('/images')
         
         return j
-        
+    
     # TODO: ExportImage, CreateImageFromMachine, UpdateImage
@@ -0,0 +1,129 @@
+import time
+import threading
+
+__all__ = ['Deadline', 'DeadlineExceeded', 'current_deadline', 'propagate']
+
+_local = threading.local()
+
+
+class DeadlineExceeded(RuntimeError):
+    """
+    Raised when a request would start, or a request or pause would end,
+    after the active :py:class:`smartdc.deadline.Deadline`.
+    """
+    pass
+
+
+class Deadline(object):
+    """
+    A time budget shared by every request made (and every pause taken by a
+    poll loop) on the current thread while it is active::
+    
+        with Deadline(30):
+            machine.stop()
+            machine.poll_until('stopped')
+    
+    Each request's connect and read timeouts are cut down to the time
+    remaining, so a composite operation (paging through ``machines()``,
+    ``delete_metadata_at_key()``'s DELETE and GET, or a poll loop) finishes
+    or fails with :py:class:`smartdc.deadline.DeadlineExceeded` within the
+    budget as a whole. Deadlines nest, an inner one never outlasting the
+    one around it, and :py:func:`smartdc.deadline.propagate` carries the
+    active deadline into worker threads.
+    """
+    def __init__(self, timeout):
+        """
+        :param timeout: seconds from now until the deadline
+        :type timeout: :py:class:`float`
+        """
+        self.timeout = timeout
+        self.expires = time.time() + timeout
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {remaining:.3f}s of {timeout}s left>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            remaining=max(self.remaining(), 0), timeout=self.timeout)
+    
+    def __enter__(self):
+        stack = _stack()
+        if stack and stack[-1].expires < self.expires:
+            self.expires = stack[-1].expires
+        stack.append(self)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        _stack().remove(self)
+    
+    def remaining(self):
+        """
+        :Returns: seconds left until the deadline, negative once it has
+            passed
+        :rtype: :py:class:`float`
+        """
+        return self.expires - time.time()
+    
+    def expired(self):
+        """
+        :rtype: :py:class:`bool`
+        """
+        return self.remaining() <= 0
+    
+    def check(self):
+        """
+        :Returns: seconds left until the deadline
+        :raises: :py:class:`smartdc.deadline.DeadlineExceeded` if it has
+            passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded('Deadline exceeded by {0:.3f} '
+                'seconds'.format(-remaining))
+        return remaining
+    
+    def clamp(self, timeout):
+        """
+        :param timeout: a :py:mod:`requests` timeout: seconds, a
+            ``(connect, read)`` tuple, or ``None``
+        
+        :Returns: `timeout` with each part cut down to the time remaining
+        :raises: :py:class:`smartdc.deadline.DeadlineExceeded` if the
+            deadline has passed
+        """
+        remaining = self.check()
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining)
+                         for t in timeout)
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def current_deadline():
+    """
+    :Returns: the innermost active deadline of the current thread, if any
+    :rtype: :py:class:`smartdc.deadline.Deadline` or ``None``
+    """
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def propagate(func):
+    """
+    :Returns: a wrapper for `func` that runs it under the deadline active
+        on the calling thread, for use with a thread pool
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return func
+    def call(*args, **kwargs):
+        with deadline:
+            return func(*args, **kwargs)
+    return call
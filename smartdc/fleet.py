@@ -0,0 +1,258 @@
+import time
+
+from .machine import Machine, PollPolicy, PollTimeout
+from .deadline import propagate
+
+__all__ = ['BulkResult', 'bulk_action', 'wait_for_state']
+
+# how far back (in minutes) listings look for deleted machines
+TOMBSTONE_MINUTES = 60
+
+# with a filtered wait, every this many ticks list all machines instead, to
+# find those that ended in a terminal state or disappeared
+FULL_LISTING_EVERY = 5
+
+
+class BulkResult(object):
+    """
+    The outcome of running one action over many machines.
+    
+    A :py:class:`smartdc.fleet.BulkResult` maps each machine to the
+    :py:class:`multiprocessing.pool.AsyncResult` (a future) for its call, and
+    summarizes the outcomes once they have completed.
+    """
+    def __init__(self, action, futures):
+        """
+        :param action: the name of the action performed
+        :type action: :py:class:`basestring`
+        
+        :param futures: mapping from machine to pending result
+        :type futures: :py:class:`dict`
+        """
+        self.action = action
+        self.futures = futures
+        """:py:class:`dict` of :py:class:`smartdc.machine.Machine` to
+        :py:class:`multiprocessing.pool.AsyncResult`"""
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {action} on {n} machines>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            action=self.action, n=len(self.futures))
+    
+    def __len__(self):
+        return len(self.futures)
+    
+    def __iter__(self):
+        return iter(self.futures.items())
+    
+    @property
+    def done(self):
+        """Whether every call has completed"""
+        return all(f.ready() for f in self.futures.values())
+    
+    def wait(self, timeout=None):
+        """
+        :param timeout: maximum seconds to wait for each pending call
+        :type timeout: :py:class:`float`
+        
+        :Returns: whether every call has completed
+        
+        Block until all calls have completed (or `timeout` elapses).
+        """
+        for f in self.futures.values():
+            f.wait(timeout)
+        return self.done
+    
+    def results(self):
+        """
+        :Returns: return values of the successful calls, by machine
+        :rtype: :py:class:`dict`
+        
+        Waits for all calls to complete.
+        """
+        self.wait()
+        return dict((m, f.get()) for m, f in self.futures.items()
+                    if f.successful())
+    
+    def failures(self):
+        """
+        :Returns: exceptions raised by the failed calls, by machine
+        :rtype: :py:class:`dict`
+        
+        Waits for all calls to complete.
+        """
+        self.wait()
+        failed = {}
+        for m, f in self.futures.items():
+            if not f.successful():
+                try:
+                    f.get()
+                except Exception as e:
+                    failed[m] = e
+        return failed
+    
+    def summary(self):
+        """
+        :Returns: counts of the total, succeeded and failed calls, along
+            with the exceptions of the failures
+        :rtype: :py:class:`dict`
+        
+        Waits for all calls to complete.
+        """
+        failed = self.failures()
+        return {'action': self.action,
+                'total': len(self.futures),
+                'succeeded': len(self.futures) - len(failed),
+                'failed': len(failed),
+                'failures': failed}
+
+
+def bulk_action(machines, action, concurrency=10, **kwargs):
+    """
+    :param machines: machines to act upon
+    :type machines: iterable of :py:class:`smartdc.machine.Machine`\s
+    
+    :param action: name of a :py:class:`smartdc.machine.Machine` method
+        (such as ``stop``, ``start``, ``reboot`` or ``delete``), or a callable
+        accepting a machine
+    :type action: :py:class:`basestring` or callable
+    
+    :param concurrency: maximum number of calls in flight at once
+    :type concurrency: :py:class:`int`
+    
+    :rtype: :py:class:`smartdc.fleet.BulkResult`
+    
+    Submit `action` for every machine on a thread pool of at most
+    `concurrency` workers and return immediately. Remaining keyword arguments
+    are passed on to each call (e.g. ``package`` for ``resize``). The calls
+    run under the caller's active :py:class:`smartdc.deadline.Deadline`, if
+    any.
+    """
+    machines = list(machines)
+    if callable(action):
+        name = getattr(action, '__name__', repr(action))
+        call = lambda m: action(m, **kwargs)
+    else:
+        name = action
+        call = lambda m: getattr(m, action)(**kwargs)
+    call = propagate(call)
+    futures = {}
+    if not machines:
+        return BulkResult(name, futures)
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(max(1, min(concurrency, len(machines))))
+    try:
+        for m in machines:
+            futures[m] = pool.apply_async(call, (m,))
+    finally:
+        pool.close()
+    return BulkResult(name, futures)
+
+
+def wait_for_state(datacenter, machines, state, interval=2, timeout=None,
+        callback=None, filtered=True, policy=None):
+    """
+    :param datacenter: datacenter that contains the machines
+    :type datacenter: :py:class:`smartdc.datacenter.DataCenter`
+    
+    :param machines: machines to watch
+    :type machines: iterable of :py:class:`smartdc.machine.Machine`\s
+    
+    :param state: target state
+    :type state: :py:class:`basestring`
+    
+    :param interval: initial pause in seconds between listings
+    :type interval: :py:class:`int`
+    
+    :param timeout: give up after this many seconds
+    :type timeout: :py:class:`float`
+    
+    :param callback: called with each machine as it reaches `state`
+    :type callback: callable
+    
+    :param filtered: whether to list only machines already in `state`
+        on most ticks
+    :type filtered: :py:class:`bool`
+    
+    :param policy: complete polling configuration, overriding `interval` 
+        and `timeout`
+    :type policy: :py:class:`smartdc.machine.PollPolicy`
+    
+    :Returns: the machines that reached `state`, those still pending, and 
+        those that ended in another terminal state instead
+    :rtype: :py:class:`tuple` of three :py:class:`list`\s
+    
+    Poll with one (paged) ``/machines`` listing per tick, saving the listed 
+    data into each watched machine and resolving it once it reports 
+    `state`. A machine that reports one of the policy's terminal states (by 
+    default ``Machine.TERMINAL_STATES``, i.e. failed or deleted) is resolved 
+    too, as it will never reach `state`, and so is one missing from a 
+    listing of all machines, which is taken as deleted. With `filtered`, 
+    most ticks list only the machines in `state`, and every 
+    :py:data:`smartdc.fleet.FULL_LISTING_EVERY`-th tick lists all machines (including 
+    recently deleted ones) to find those. Machines still pending when the 
+    policy's deadline passes are returned rather than raising 
+    :py:class:`smartdc.machine.PollTimeout`.
+    """
+    policy = policy or PollPolicy(interval=interval, timeout=timeout)
+    terminal = policy.terminal
+    if terminal is None:
+        terminal = Machine.TERMINAL_STATES
+    pending = dict((m.id, m) for m in machines)
+    reached = []
+    ended = []
+    delays = policy.delays()
+    tick = 0
+    while pending:
+        complete = (not filtered or
+                    tick % FULL_LISTING_EVERY == FULL_LISTING_EVERY - 1)
+        if complete:
+            params = {'tombstone': TOMBSTONE_MINUTES}
+        else:
+            params = _listing_params(state)
+        listed = set()
+        for page in datacenter._raw_machine_pages(params):
+            for data in page:
+                listed.add(data.get('id'))
+                m = pending.get(data.get('id'))
+                current = data.get('state')
+                if m is None or (current != state and
+                                 current not in terminal):
+                    continue
+                m._save(data)
+                del pending[m.id]
+                if current == state:
+                    reached.append(m)
+                    if callback:
+                        callback(m)
+                else:
+                    ended.append(m)
+        if complete:
+            for machine_id in set(pending) - listed:
+                m = pending.pop(machine_id)
+                m.state = 'deleted'
+                if state == 'deleted':
+                    reached.append(m)
+                    if callback:
+                        callback(m)
+                else:
+                    ended.append(m)
+        if not pending:
+            break
+        tick += 1
+        try:
+            time.sleep(next(delays))
+        except PollTimeout:
+            break
+    return reached, list(pending.values()), ended
+
+
+def _listing_params(state):
+    """
+    Query parameters listing the machines in `state`, including the recently
+    deleted ones when that is the state asked for.
+    """
+    params = {'state': state}
+    if state == 'deleted':
+        params['tombstone'] = TOMBSTONE_MINUTES
+    return params
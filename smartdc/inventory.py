@@ -0,0 +1,292 @@
+import threading
+
+from .machine import Machine, dt_time
+
+__all__ = ['MachineInventory']
+
+INDEXES = ('name', 'state', 'dataset', 'image', 'package')
+
+
+class MachineInventory(object):
+    """
+    An in-memory collection of :py:class:`smartdc.machine.Machine` objects 
+    with hash indexes for constant-time lookups.
+    
+    Machines are indexed by id, name, state, dataset, image, package and IP 
+    address, and by each of their tags. The inventory is built from a 
+    listing and brought up to date incrementally with :py:meth:`update` or 
+    :py:meth:`sync`, so that repeated lookups need no further requests. It 
+    is safe to use from several threads.
+    """
+    def __init__(self, machines=(), datacenter=None):
+        """
+        :param machines: initial contents
+        :type machines: iterable of :py:class:`smartdc.machine.Machine`\s
+        
+        :param datacenter: where :py:meth:`refresh` lists machines from
+        :type datacenter: :py:class:`smartdc.datacenter.DataCenter`
+        """
+        self.datacenter = datacenter
+        self._listing = {}
+        self._machines = {}
+        self._keys = {}
+        self._indexes = dict((field, {}) for field in INDEXES)
+        self._ips = {}
+        self._tags = {}
+        self._stamps = {}
+        self._lock = threading.RLock()
+        self.update(machines)
+    
+    @classmethod
+    def from_datacenter(cls, datacenter, **kwargs):
+        """
+        ::
+        
+            GET /:login/machines
+        
+        :param datacenter: datacenter to list
+        :type datacenter: :py:class:`smartdc.datacenter.DataCenter`
+        
+        :rtype: :py:class:`smartdc.inventory.MachineInventory`
+        
+        Build an inventory from a complete listing. Keyword arguments are 
+        passed on to :py:meth:`smartdc.datacenter.DataCenter.machines` (e.g. 
+        ``workers`` or ``tags``) and reused by :py:meth:`refresh`.
+        """
+        inventory = cls(datacenter.machines(**kwargs), datacenter=datacenter)
+        inventory._listing = kwargs
+        return inventory
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} machines>'.format(
+            module=self.__module__, cls=self.__class__.__name__, n=len(self))
+    
+    def __len__(self):
+        return len(self._machines)
+    
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._machines.values()))
+    
+    def __contains__(self, machine):
+        return getattr(machine, 'id', machine) in self._machines
+    
+    def _index(self, machine):
+        key = dict((field, getattr(machine, field, None)) 
+                   for field in INDEXES)
+        key['ips'] = tuple(machine._ips or ())
+        key['tags'] = tuple((k, v) for k, v in (machine.tags or {}).items())
+        for field in INDEXES:
+            self._indexes[field].setdefault(key[field], set()).add(machine.id)
+        for ip in key['ips']:
+            self._ips[ip] = machine.id
+        for tag in key['tags']:
+            self._tags.setdefault(tag, set()).add(machine.id)
+            self._tags.setdefault((tag[0], None), set()).add(machine.id)
+        self._keys[machine.id] = key
+        self._machines[machine.id] = machine
+    
+    def _unindex(self, machine_id):
+        key = self._keys.pop(machine_id, None)
+        self._stamps.pop(machine_id, None)
+        machine = self._machines.pop(machine_id, None)
+        if key is None:
+            return machine
+        for field in INDEXES:
+            self._discard(self._indexes[field], key[field], machine_id)
+        for ip in key['ips']:
+            if self._ips.get(ip) == machine_id:
+                del self._ips[ip]
+        for tag in key['tags']:
+            self._discard(self._tags, tag, machine_id)
+            self._discard(self._tags, (tag[0], None), machine_id)
+        return machine
+    
+    @staticmethod
+    def _discard(index, value, machine_id):
+        ids = index.get(value)
+        if ids is not None:
+            ids.discard(machine_id)
+            if not ids:
+                del index[value]
+    
+    def add(self, machine):
+        """
+        Insert `machine`, replacing (and re-indexing) any machine with the 
+        same id.
+        """
+        with self._lock:
+            self._unindex(machine.id)
+            self._index(machine)
+    
+    def remove(self, machine):
+        """
+        :param machine: machine or unique ID to remove
+        
+        :Returns: the removed machine, or ``None`` if it was not present
+        """
+        with self._lock:
+            return self._unindex(getattr(machine, 'id', machine))
+    
+    def update(self, machines, complete=False):
+        """
+        :param machines: machines from a later listing
+        :type machines: iterable of :py:class:`smartdc.machine.Machine`\s
+        
+        :param complete: whether `machines` is a complete listing, so that 
+            machines missing from it should be removed
+        :type complete: :py:class:`bool`
+        
+        Add or re-index each of the listed machines.
+        """
+        with self._lock:
+            seen = set()
+            for machine in machines:
+                self._unindex(machine.id)
+                self._index(machine)
+                seen.add(machine.id)
+            if complete:
+                for machine_id in set(self._machines) - seen:
+                    self._unindex(machine_id)
+    
+    @staticmethod
+    def _stamp(data):
+        return (data.get('updated', data.get('created')), data.get('state'))
+    
+    def _changed(self, machine_id, stamp):
+        previous = self._stamps.get(machine_id)
+        if previous is not None:
+            return previous != stamp
+        # added as a Machine object, so compare against its parsed fields
+        machine = self._machines[machine_id]
+        updated = dt_time(stamp[0]) if stamp[0] else None
+        return updated != machine.updated or stamp[1] != machine.state
+    
+    def sync(self, listing):
+        """
+        :param listing: a complete listing of raw machine dicts, as returned 
+            by ``GET /:login/machines``
+        :type listing: iterable of :py:class:`dict`\s
+        
+        :Returns: the machines added, removed and changed
+        :rtype: :py:class:`tuple` of three :py:class:`list`\s
+        
+        Apply only the differences between `listing` and the inventory. A 
+        machine whose ``updated`` timestamp and state are unchanged is left 
+        alone; a changed one has the new data saved into the existing 
+        :py:class:`smartdc.machine.Machine` object and is re-indexed; new 
+        machines are instantiated, and those missing from `listing` are 
+        removed.
+        """
+        added, removed, changed = [], [], []
+        with self._lock:
+            seen = set()
+            for data in listing:
+                machine_id = data['id']
+                seen.add(machine_id)
+                stamp = self._stamp(data)
+                machine = self._machines.get(machine_id)
+                if machine is None:
+                    machine = Machine(datacenter=self.datacenter, data=data)
+                    self._index(machine)
+                    added.append(machine)
+                elif self._changed(machine_id, stamp):
+                    self._unindex(machine_id)
+                    machine._save(data)
+                    self._index(machine)
+                    changed.append(machine)
+                else:
+                    continue
+                self._stamps[machine_id] = stamp
+            for machine_id in set(self._machines) - seen:
+                removed.append(self._unindex(machine_id))
+        return added, removed, changed
+    
+    def refresh(self):
+        """
+        ::
+        
+            GET /:login/machines
+        
+        :Returns: the machines added, removed and changed
+        :rtype: :py:class:`tuple` of three :py:class:`list`\s
+        
+        List the machines of the inventory's datacenter again, with the 
+        predicates it was built with, and :py:meth:`sync` with the listing.
+        """
+        dc = self.datacenter
+        listing = dict(self._listing)
+        for option in ('paged', 'limit', 'offset', 'workers'):
+            listing.pop(option, None)
+        params = dc._machine_params(**listing)
+        return self.sync(m for page in dc._raw_machine_pages(params) 
+                         for m in page)
+    
+    def _lookup(self, index, value):
+        with self._lock:
+            return [self._machines[i] for i in index.get(value, ())]
+    
+    def get(self, machine_id):
+        """
+        :Returns: the machine with this unique ID, or ``None``
+        """
+        return self._machines.get(machine_id)
+    
+    def by_name(self, name):
+        """
+        :Returns: the machine with this name, or ``None``
+        """
+        found = self._lookup(self._indexes['name'], name)
+        return found[0] if found else None
+    
+    def by_ip(self, ip):
+        """
+        :Returns: the machine with this IP address, or ``None``
+        """
+        with self._lock:
+            return self._machines.get(self._ips.get(ip))
+    
+    def by_state(self, state):
+        """
+        :rtype: :py:class:`list` of :py:class:`smartdc.machine.Machine`\s
+        """
+        return self._lookup(self._indexes['state'], state)
+    
+    def by_dataset(self, dataset):
+        """
+        :rtype: :py:class:`list` of :py:class:`smartdc.machine.Machine`\s
+        """
+        return self._lookup(self._indexes['dataset'], dataset)
+    
+    def by_image(self, image):
+        """
+        :rtype: :py:class:`list` of :py:class:`smartdc.machine.Machine`\s
+        """
+        return self._lookup(self._indexes['image'], image)
+    
+    def by_package(self, package):
+        """
+        :rtype: :py:class:`list` of :py:class:`smartdc.machine.Machine`\s
+        """
+        return self._lookup(self._indexes['package'], package)
+    
+    def by_tag(self, key, value=None):
+        """
+        :param key: tag name
+        :param value: tag value; if omitted, any machine with the tag matches
+        
+        :rtype: :py:class:`list` of :py:class:`smartdc.machine.Machine`\s
+        """
+        return self._lookup(self._tags, (key, value))
+    
+    def counts(self, field):
+        """
+        :param field: one of ``name``, ``state``, ``dataset``, ``image`` or 
+            ``package``
+        
+        :Returns: the number of machines for each value of `field`
+        :rtype: :py:class:`dict`
+        """
+        with self._lock:
+            return dict((value, len(ids)) 
+                        for value, ids in self._indexes[field].items())
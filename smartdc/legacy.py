@@ -1,5 +1,5 @@
 from __future__ import print_function
-from .datacenter import DataCenter
+from .datacenter import DataCenter, search_dicts
 
 class LegacyDataCenter(DataCenter):
     """
@@ -12,7 +12,7 @@ class LegacyDataCenter(DataCenter):
         raise RuntimeError('Method no longer supported by SDC')
     
     def packages(self, search=None, fields=('name',)):
-        j, _ = self.request('GET', '/packages')
+        j = self._catalog('/packages')
         if search:
             return list(search_dicts(j, search, fields))
         else:
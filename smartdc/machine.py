@@ -1,8 +1,11 @@
 import time
+import random
+import calendar
 from datetime import datetime
-import uuid
 
-__all__ = ['Machine', 'Snapshot']
+from .deadline import current_deadline
+
+__all__ = ['Machine', 'Snapshot', 'PollPolicy', 'PollTimeout']
 
 def priv(x): 
     """
@@ -28,6 +31,20 @@ def dt_time(x):
     return datetime.strptime(x[:19], "%Y-%m-%dT%H:%M:%S")
 
 
+_interned = {}
+
+
+def intern_value(x):
+    """
+    Return a canonical instance of the string `x`, so that the many machines 
+    sharing a state, type, dataset, image or package hold one copy of it. 
+    (Unlike the builtin ``intern``, this also accepts unicode on Python 2.)
+    """
+    if x is None:
+        return None
+    return _interned.setdefault(x, x)
+
+
 def timestamp(x): 
     """
     Convert ISO8601 into a UNIX timestamp (via dt_time)
@@ -35,6 +52,116 @@ def timestamp(x):
     return calendar.timegm(dt_time(x).timetuple())
 
 
+class PollTimeout(RuntimeError):
+    """
+    Raised when polling does not reach the awaited condition before the 
+    deadline of its :py:class:`smartdc.machine.PollPolicy`.
+    """
+    pass
+
+
+class PollPolicy(object):
+    """
+    Pacing for the ``poll_until`` and ``poll_while`` helpers.
+    
+    The pause between polls starts at `interval` and is multiplied by 
+    `backoff` after every poll, up to `max_interval`. Each pause is 
+    randomized by up to +/- `jitter` (a fraction of the pause) so that many 
+    pollers do not synchronize. Polling gives up with 
+    :py:class:`smartdc.machine.PollTimeout` once `timeout` seconds have 
+    passed, and :py:meth:`smartdc.machine.Machine.poll_until` returns early 
+    when the resource reaches one of the `terminal` states.
+    """
+    def __init__(self, interval=2, backoff=1.5, max_interval=30, jitter=0.1, 
+            timeout=None, terminal=None):
+        """
+        :param interval: initial pause in seconds between polls
+        :type interval: :py:class:`float`
+        
+        :param backoff: multiplier applied to the pause after each poll
+        :type backoff: :py:class:`float`
+        
+        :param max_interval: upper bound for the pause in seconds
+        :type max_interval: :py:class:`float`
+        
+        :param jitter: maximum random variation, as a fraction of the pause
+        :type jitter: :py:class:`float`
+        
+        :param timeout: give up after this many seconds (default: never)
+        :type timeout: :py:class:`float`
+        
+        :param terminal: states after which waiting is pointless (default: 
+            the resource's ``TERMINAL_STATES``)
+        :type terminal: :py:class:`set` of :py:class:`basestring`\s
+        """
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.terminal = terminal
+    
+    def __repr__(self):
+        return ('<{module}.{cls}: interval={interval} backoff={backoff} '
+                'max_interval={max_interval} timeout={timeout}>').format(
+            module=self.__module__, cls=self.__class__.__name__, 
+            interval=self.interval, backoff=self.backoff, 
+            max_interval=self.max_interval, timeout=self.timeout)
+    
+    def delays(self):
+        """
+        :Returns: an iterator of successive pauses in seconds
+        :raises: :py:class:`smartdc.machine.PollTimeout` when the next pause 
+            would start after the deadline
+        
+        The deadline is fixed when this method is called, and the last pause 
+        is truncated so that one final poll happens at the deadline. Pauses 
+        are likewise cut short by a :py:class:`smartdc.deadline.Deadline` 
+        active at the time, which raises 
+        :py:class:`smartdc.deadline.DeadlineExceeded` once it has passed.
+        """
+        if self.timeout is None:
+            deadline = None
+        else:
+            deadline = time.time() + self.timeout
+        return self._delays(deadline, current_deadline())
+    
+    def _delays(self, deadline, budget=None):
+        delay = self.interval
+        while True:
+            pause = delay
+            if self.jitter:
+                pause *= 1 + random.uniform(-self.jitter, self.jitter)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise PollTimeout('Gave up polling after {0} seconds'
+                        .format(self.timeout))
+                pause = min(pause, remaining)
+            if budget is not None:
+                pause = min(pause, budget.check())
+            yield max(pause, 0)
+            delay *= self.backoff
+            if self.max_interval:
+                delay = min(delay, self.max_interval)
+    
+
+def _poll(resource, condition, policy):
+    """
+    Refresh `resource` via its ``status()`` method until `condition` holds 
+    for its state or the state is terminal, pausing according to `policy`.
+    """
+    terminal = policy.terminal
+    if terminal is None:
+        terminal = resource.TERMINAL_STATES
+    delays = policy.delays()
+    while True:
+        current = resource.status()
+        if condition(current) or current in terminal:
+            return current
+        time.sleep(next(delays))
+
+
 class Machine(object):
     """
     A local proxy representing the state of a remote CloudAPI machine.
@@ -47,6 +174,18 @@ class Machine(object):
     cache in most cases, instead requiring the user to explicitly update with 
     a :py:meth:`refresh` call.
     """
+    TERMINAL_STATES = frozenset(['failed', 'deleted'])
+    
+    # statuses with which CloudAPI answers for a machine that is gone
+    GONE_STATUSES = frozenset([404, 410])
+    
+    # no per-instance __dict__: a resident fleet may hold 100k of these
+    __slots__ = ('id', 'datacenter', 'name', 'type', 'state', 'dataset', 
+                 'image', 'package', 'memory', 'disk', '_ips', 'tags', 
+                 '_metadata', '_raw_metadata', '_known_credentials', 
+                 '_boot_script', '_created', '_updated', '_hash', 
+                 '__weakref__')
+    
     def __init__(self, datacenter, machine_id=None, data=None, 
             credentials=False):
         """
@@ -79,6 +218,9 @@ class Machine(object):
             machine
         :var state: last-known state of the machine
         :var dataset: the machine template
+        :var image: unique ID of the machine image (SDC 7)
+        :var package: name of the package the machine was provisioned with 
+            (SDC 7)
         :var memory: the RAM (MiB) allocated for the machine 
             (:py:class:`int`\)
         :var disk: the persistent storage (MiB) allocated for the 
@@ -86,6 +228,8 @@ class Machine(object):
         :var ips: :py:class:`list` of IPv4 addresses for the machine
         :var metadata: :py:class:`dict` of user-generated attributes for 
             the machine
+        :var tags: :py:class:`dict` of tags as last listed (see 
+            :py:meth:`get_tags` for the current ones)
         :var created: :py:class:`datetime.datetime` of machine creation 
             time
         :var updated: :py:class:`datetime.datetime` of machine update 
@@ -130,26 +274,86 @@ class Machine(object):
         return not self.__eq__(other)
     
     def __hash__(self):
-        return uuid.UUID(self.id).int
+        try:
+            return self._hash
+        except AttributeError:
+            import uuid
+            self._hash = uuid.UUID(self.id).int
+            return self._hash
     
     def _save(self, data):
         """
         Take the data from a dict and commit them to appropriate attributes.
         """
         self.name = data.get('name')
-        self.type = data.get('type')
-        self.state = data.get('state')
-        self.dataset = data.get('dataset')
+        self.type = intern_value(data.get('type'))
+        self.state = intern_value(data.get('state'))
+        self.dataset = intern_value(data.get('dataset'))
+        self.image = intern_value(data.get('image'))
+        self.package = intern_value(data.get('package'))
         self.memory = data.get('memory')
         self.disk = data.get('disk')
         self._ips = data.get('ips', [])
-        self.metadata = data.get('metadata', {})
-        if not hasattr(self, '_credentials'):
-            self._credentials = {}
-        self._credentials.update(self.metadata.pop('credentials', {}))
-        self.boot_script = self.metadata.pop('user-script', None)
-        self.created = dt_time(data.get('created'))
-        self.updated = dt_time(data.get('updated', data.get('created')))
+        self.tags = data.get('tags', {})
+        if not hasattr(self, '_known_credentials'):
+            self._known_credentials = {}
+        # the rest is decoded on first access, as most listings only need 
+        # ids and states
+        self._raw_metadata = data.get('metadata', {})
+        self._created = data.get('created')
+        self._updated = data.get('updated', data.get('created'))
+    
+    def _decode_metadata(self):
+        """
+        Split the pending raw metadata into :py:attr:`metadata`, the 
+        credentials and :py:attr:`boot_script`.
+        """
+        metadata = self._raw_metadata
+        if metadata is None:
+            return
+        self._known_credentials.update(metadata.pop('credentials', {}))
+        self._boot_script = metadata.pop('user-script', None)
+        self._metadata = metadata
+        self._raw_metadata = None
+    
+    @property
+    def metadata(self):
+        self._decode_metadata()
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value):
+        self._decode_metadata()
+        self._metadata = value
+    
+    @property
+    def boot_script(self):
+        self._decode_metadata()
+        return self._boot_script
+    
+    @boot_script.setter
+    def boot_script(self, value):
+        self._decode_metadata()
+        self._boot_script = value
+    
+    @property
+    def _credentials(self):
+        self._decode_metadata()
+        return self._known_credentials
+    
+    @property
+    def created(self):
+        if self._created is not None and not isinstance(self._created, 
+                datetime):
+            self._created = dt_time(self._created)
+        return self._created
+    
+    @property
+    def updated(self):
+        if self._updated is not None and not isinstance(self._updated, 
+                datetime):
+            self._updated = dt_time(self._updated)
+        return self._updated
     
     @property
     def path(self):
@@ -251,9 +455,17 @@ class Machine(object):
         :rtype: :py:class:`basestring`
         
         Refresh the machine's information by fetching it remotely, then 
-        returning the :py:attr:`state` as a string.
+        returning the :py:attr:`state` as a string. A machine the server no 
+        longer knows (404) or reports as gone (410) is ``'deleted'``.
         """
-        self.refresh()
+        from requests.exceptions import HTTPError
+        try:
+            self.refresh()
+        except HTTPError as e:
+            if (e.response is None or
+                    e.response.status_code not in self.GONE_STATUSES):
+                raise
+            self.state = 'deleted'
         return self.state
     
     def stop(self):
@@ -318,7 +530,7 @@ class Machine(object):
         j, r = self.datacenter.request('DELETE', self.path)
         r.raise_for_status()
     
-    def poll_until(self, state, interval=2):
+    def poll_until(self, state, interval=2, timeout=None, policy=None):
         """
         ::
         
@@ -327,21 +539,34 @@ class Machine(object):
         :param state: target state
         :type state: :py:class:`basestring`
         
-        :param interval: pause in seconds between polls
+        :param interval: initial pause in seconds between polls
         :type interval: :py:class:`int`
         
+        :param timeout: give up after this many seconds
+        :type timeout: :py:class:`float`
+        
+        :param policy: complete polling configuration, overriding `interval` 
+            and `timeout`
+        :type policy: :py:class:`smartdc.machine.PollPolicy`
+        
+        :Returns: the last state seen
+        :rtype: :py:class:`basestring`
+        :raises: :py:class:`smartdc.machine.PollTimeout`
+        
         Convenience method that continuously polls the current state of the 
-        machine remotely, and returns until the named `state` argument is 
-        reached. The default wait `interval` between requests is 2 seconds, 
-        but it may be changed.
+        machine remotely, and returns when the named `state` argument is 
+        reached. The wait between requests starts at `interval` (2 seconds 
+        by default) and backs off, with jitter, as described for 
+        :py:class:`smartdc.machine.PollPolicy`.
         
-        .. Note:: If the next state is wrongly identified, this method may
-            loop forever.
+        If the machine reaches a terminal state (``failed`` or ``deleted``) 
+        instead, polling stops early and that state is returned, so callers 
+        should check the result.
         """
-        while self.status() != state:
-            time.sleep(interval)
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return _poll(self, lambda current: current == state, policy)
     
-    def poll_while(self, state, interval=2):
+    def poll_while(self, state, interval=2, timeout=None, policy=None):
         """
         ::
         
@@ -350,19 +575,31 @@ class Machine(object):
         :param state: (assumed) current state
         :type state: :py:class:`basestring`
         
-        :param interval: pause in seconds between polls
+        :param interval: initial pause in seconds between polls
         :type interval: :py:class:`int`
         
+        :param timeout: give up after this many seconds
+        :type timeout: :py:class:`float`
+        
+        :param policy: complete polling configuration, overriding `interval` 
+            and `timeout`
+        :type policy: :py:class:`smartdc.machine.PollPolicy`
+        
+        :Returns: the new state
+        :rtype: :py:class:`basestring`
+        :raises: :py:class:`smartdc.machine.PollTimeout`
+        
         Convenience method that continuously polls the current state of the 
         machine remotely, and returns while the machine has the named `state` 
-        argument. Once the state changes, the method returns. The default wait 
-        `interval` between requests is 2 seconds, but it may be changed.
+        argument. Once the state changes, the method returns. The wait 
+        between requests starts at `interval` (2 seconds by default) and 
+        backs off as described for :py:class:`smartdc.machine.PollPolicy`.
         
-        .. Note:: If a state transition has not correctly been triggered, this
-            method may loop forever.
+        .. Note:: If a state transition has not correctly been triggered, 
+            this method polls until `timeout`, or forever if there is none.
         """
-        while self.status() == state:
-            time.sleep(interval)
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return _poll(self, lambda current: current != state, policy)
     
     def get_metadata(self):
         """
@@ -512,7 +749,6 @@ class Machine(object):
         :Returns: the value for a single tag
         :rtype: :py:class:`basestring`
         """
-        headers = {'Accept': 'text/plain'}
         j, _ = self.datacenter.request('GET', self.path + '/tags/' + tag)
         return j
     
@@ -628,6 +864,11 @@ class Snapshot(object):
     convenient container for a snapshot's state and for performing methods on 
     it.
     """
+    TERMINAL_STATES = frozenset(['failed', 'deleted'])
+    
+    __slots__ = ('name', 'machine', 'state', 'created', 'updated', 
+                 '__weakref__')
+    
     def __init__(self, machine, name=None, data=None):
         """
         :param machine: source of the snapshot
@@ -682,7 +923,7 @@ class Snapshot(object):
         """
         Take the data from a dict and commit them to appropriate attributes.
         """
-        self.state = data.get('state')
+        self.state = intern_value(data.get('state'))
         self.created = dt_time(data.get('created'))
         self.updated = dt_time(data.get('updated'))
     
@@ -721,6 +962,43 @@ class Snapshot(object):
         self.refresh()
         return self.state
     
+    def poll_until(self, state, interval=2, timeout=None, policy=None):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        
+        :param state: target state
+        :type state: :py:class:`basestring`
+        
+        :Returns: the last state seen
+        :raises: :py:class:`smartdc.machine.PollTimeout`
+        
+        Polls the snapshot's state until `state` (or a terminal state) is 
+        reached, with the same parameters as 
+        :py:meth:`smartdc.machine.Machine.poll_until`.
+        """
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return _poll(self, lambda current: current == state, policy)
+    
+    def poll_while(self, state, interval=2, timeout=None, policy=None):
+        """
+        ::
+        
+            GET /:login/machines/:id/snapshots/:name
+        
+        :param state: (assumed) current state
+        :type state: :py:class:`basestring`
+        
+        :Returns: the new state
+        :raises: :py:class:`smartdc.machine.PollTimeout`
+        
+        Polls the snapshot's state while it remains `state`, with the same 
+        parameters as :py:meth:`smartdc.machine.Machine.poll_while`.
+        """
+        policy = policy or PollPolicy(interval=interval, timeout=timeout)
+        return _poll(self, lambda current: current != state, policy)
+    
     def delete(self):
         """
         ::
@@ -0,0 +1,299 @@
+import threading
+
+__all__ = ['RequestMetrics', 'Histogram', 'endpoint_template',
+           'DEFAULT_BUCKETS']
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+"""Upper bounds (in seconds) of the latency histogram buckets"""
+
+# the placeholder that follows each CloudAPI collection in a path
+PLACEHOLDERS = {
+    'machines': ':id',
+    'snapshots': ':name',
+    'metadata': ':key',
+    'tags': ':tag',
+    'keys': ':key',
+    'datasets': ':id',
+    'images': ':id',
+    'packages': ':package',
+    'networks': ':id',
+    'datacenters': ':name',
+}
+
+_templates = {}
+
+
+def endpoint_template(path):
+    """
+    :param path: request path relative to the login, e.g.
+        ``/machines/4a5ed2fc-.../tags/role``
+    :type path: :py:class:`basestring`
+    
+    :Returns: the path with identifiers replaced by placeholders, e.g.
+        ``/machines/:id/tags/:tag``
+    
+    Results are memoized, as the set of paths a client uses is small.
+    """
+    template = _templates.get(path)
+    if template is not None:
+        return template
+    segments = [s for s in path.split('/') if s]
+    parts = []
+    for i, segment in enumerate(segments):
+        previous = segments[i - 1] if i else None
+        if previous in PLACEHOLDERS and parts[-1] == previous:
+            parts.append(PLACEHOLDERS[previous])
+        else:
+            parts.append(segment)
+    template = '/' + '/'.join(parts)
+    if len(_templates) < 10000:
+        _templates[path] = template
+    return template
+
+
+class Histogram(object):
+    """
+    Cumulative bucketed counts of observed values, in the manner of a
+    Prometheus histogram.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value):
+        """
+        Add a single observation.
+        """
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+    
+    def cumulative(self):
+        """
+        :Returns: pairs of upper bound and the number of observations at or
+            below it, ending with ``'+Inf'``
+        :rtype: :py:class:`list` of :py:class:`tuple`\s
+        """
+        total = 0
+        result = []
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            result.append((bound, total))
+        result.append(('+Inf', self.count))
+        return result
+    
+    def as_dict(self):
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': self.cumulative()}
+
+
+def _escape(value):
+    # backslash first, so the escapes added after it are left alone
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(labels):
+    return ','.join('{0}="{1}"'.format(k, _escape(v))
+                    for k, v in sorted(labels.items()))
+
+
+class RequestMetrics(object):
+    """
+    Counters and latency histograms for the requests made by a
+    :py:class:`smartdc.datacenter.DataCenter`, grouped by HTTP method and
+    endpoint template (such as ``/machines/:id``).
+    
+    Records latency, response status codes, bytes sent and received, retries,
+    and time spent signing requests. Response bytes are counted both as 
+    decoded and as transferred (``wire_bytes_received``), which differ when 
+    responses are compressed. The figures are available as a
+    :py:class:`dict` through :py:meth:`as_dict` and in the Prometheus text
+    exposition format through :py:meth:`prometheus`.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: upper bounds of the latency histogram buckets, in
+            seconds
+        :type buckets: :py:class:`tuple` of :py:class:`float`\s
+        """
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} requests>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            n=sum(h.count for h in self.latency.values()))
+    
+    def reset(self):
+        """
+        Discard everything recorded so far.
+        """
+        with self._lock:
+            self.latency = {}
+            self.statuses = {}
+            self.bytes_sent = {}
+            self.bytes_received = {}
+            self.wire_bytes_received = {}
+            self.retries = {}
+            self.signatures = 0
+            self.signing_time = 0.0
+    
+    def record(self, method, path, status, elapsed, sent=0, received=0, 
+            wire=None):
+        """
+        :param status: HTTP status code, or ``'error'`` if no response
+            arrived
+        
+        :param wire: size of the response body as transferred, if it was 
+            compressed (default: `received`)
+        
+        Record one completed request.
+        """
+        key = (method, endpoint_template(path))
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(self.buckets)
+            histogram.observe(elapsed)
+            skey = key + (str(status),)
+            self.statuses[skey] = self.statuses.get(skey, 0) + 1
+            self.bytes_sent[key] = self.bytes_sent.get(key, 0) + sent
+            self.bytes_received[key] = (self.bytes_received.get(key, 0) +
+                                        received)
+            self._add_wire(key, received if wire is None else wire)
+    
+    def _add_wire(self, key, wire):
+        self.wire_bytes_received[key] = (self.wire_bytes_received.get(key, 0) 
+                                         + wire)
+    
+    def record_received(self, method, path, received, wire=None):
+        """
+        Add the size of a response body that was streamed, and so could not 
+        be counted when the request was recorded.
+        """
+        key = (method, endpoint_template(path))
+        with self._lock:
+            self.bytes_received[key] = (self.bytes_received.get(key, 0) + 
+                                        received)
+            self._add_wire(key, received if wire is None else wire)
+    
+    def record_retry(self, method, path):
+        """
+        Record a request being sent again.
+        """
+        key = (method, endpoint_template(path))
+        with self._lock:
+            self.retries[key] = self.retries.get(key, 0) + 1
+    
+    def record_signing(self, elapsed):
+        """
+        Record the time taken to sign one request.
+        """
+        with self._lock:
+            self.signatures += 1
+            self.signing_time += elapsed
+    
+    def as_dict(self):
+        """
+        :Returns: a snapshot of all the metrics, keyed by ``"METHOD
+            /endpoint"`` strings
+        :rtype: :py:class:`dict`
+        """
+        def name(key):
+            return key[0] + ' ' + key[1]
+        with self._lock:
+            endpoints = {}
+            for key, histogram in self.latency.items():
+                endpoints[name(key)] = {
+                    'latency': histogram.as_dict(),
+                    'statuses': {},
+                    'bytes_sent': self.bytes_sent.get(key, 0),
+                    'bytes_received': self.bytes_received.get(key, 0),
+                    'wire_bytes_received': 
+                        self.wire_bytes_received.get(key, 0),
+                    'retries': self.retries.get(key, 0),
+                }
+            for (method, template, status), n in self.statuses.items():
+                endpoints[name((method, template))]['statuses'][status] = n
+            for key, n in self.retries.items():
+                if name(key) not in endpoints:
+                    endpoints[name(key)] = {'retries': n}
+            return {'endpoints': endpoints,
+                    'signatures': self.signatures,
+                    'signing_time': self.signing_time}
+    
+    def prometheus(self, prefix='smartdc', labels=None):
+        """
+        :param prefix: prefix for the metric names
+        :type prefix: :py:class:`basestring`
+        
+        :param labels: constant labels to add to every sample, such as the
+            datacenter location
+        :type labels: :py:class:`dict`
+        
+        :Returns: the metrics in the Prometheus text exposition format
+        :rtype: :py:class:`str`
+        """
+        labels = labels or {}
+        lines = []
+        
+        def family(name, kind, doc):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, doc))
+            lines.append('# TYPE {0}_{1} {2}'.format(prefix, name, kind))
+        
+        def sample(name, value, **extra):
+            lbl = dict(labels, **extra)
+            lines.append('{0}_{1}{{{2}}} {3}'.format(prefix, name,
+                         _labels(lbl), value))
+        
+        with self._lock:
+            family('request_duration_seconds', 'histogram',
+                   'CloudAPI request latency.')
+            for (method, template), h in sorted(self.latency.items()):
+                for bound, n in h.cumulative():
+                    sample('request_duration_seconds_bucket', n,
+                           method=method, endpoint=template, le=bound)
+                sample('request_duration_seconds_sum', repr(h.sum),
+                       method=method, endpoint=template)
+                sample('request_duration_seconds_count', h.count,
+                       method=method, endpoint=template)
+            family('responses_total', 'counter',
+                   'CloudAPI responses by status code.')
+            for (method, template, status), n in sorted(
+                    self.statuses.items()):
+                sample('responses_total', n, method=method,
+                       endpoint=template, status=status)
+            family('request_bytes_total', 'counter',
+                   'Request body bytes sent.')
+            for (method, template), n in sorted(self.bytes_sent.items()):
+                sample('request_bytes_total', n, method=method,
+                       endpoint=template)
+            family('response_bytes_total', 'counter',
+                   'Response body bytes received.')
+            for (method, template), n in sorted(self.bytes_received.items()):
+                sample('response_bytes_total', n, method=method,
+                       endpoint=template)
+            family('response_wire_bytes_total', 'counter',
+                   'Response body bytes as transferred, before '
+                   'decompression.')
+            for (method, template), n in sorted(
+                    self.wire_bytes_received.items()):
+                sample('response_wire_bytes_total', n, method=method,
+                       endpoint=template)
+            family('retries_total', 'counter', 'Requests sent again.')
+            for (method, template), n in sorted(self.retries.items()):
+                sample('retries_total', n, method=method, endpoint=template)
+            family('signatures_total', 'counter', 'Requests signed.')
+            sample('signatures_total', self.signatures)
+            family('signing_seconds_total', 'counter',
+                   'Time spent signing requests.')
+            sample('signing_seconds_total', repr(self.signing_time))
+        return '\n'.join(lines) + '\n'
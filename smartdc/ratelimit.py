@@ -0,0 +1,205 @@
+import time
+import threading
+
+from .deadline import DeadlineExceeded
+
+__all__ = ['RateLimiter', 'rate_limiter', 'THROTTLE_STATUSES']
+
+THROTTLE_STATUSES = frozenset([429, 503])
+"""Response statuses taken as a sign of server overload"""
+
+
+class RateLimiter(object):
+    """
+    Paces the requests made to one CloudAPI endpoint by every thread and
+    every DataCenter sharing it.
+    
+    With a `rate`, requests are drawn from a token bucket refilled at `rate`
+    tokens per second and holding at most `burst`. The default `burst` of 1
+    spaces requests evenly; a larger one lets short bursts go out at once
+    while the sustained rate stays under the limit. With a `concurrency`,
+    at most that many requests are in flight at once.
+    
+    With `adaptive`, the concurrency limit follows an AIMD (additive
+    increase, multiplicative decrease) scheme, as TCP does with its window:
+    a throttling response (see :py:data:`THROTTLE_STATUSES`) multiplies the
+    limit by `decrease`, down to `min_concurrency`, while each successful
+    response adds `increase` divided by the limit, so that it grows by about
+    `increase` per round of requests, back up to `concurrency`. Only the
+    first of the throttling responses to requests sent before a decrease
+    counts, so a burst of them shrinks the limit once.
+    """
+    def __init__(self, rate=None, burst=None, concurrency=None,
+            adaptive=False, min_concurrency=1, increase=1.0, decrease=0.5):
+        """
+        :param rate: sustained requests per second (default: unlimited)
+        :type rate: :py:class:`float`
+        
+        :param burst: requests that may be sent at once after a lull
+            (default: 1)
+        :type burst: :py:class:`float`
+        
+        :param concurrency: maximum requests in flight (default: unlimited,
+            or 10 with `adaptive`)
+        :type concurrency: :py:class:`int`
+        
+        :param adaptive: whether to adjust the concurrency limit to
+            throttling responses
+        :type adaptive: :py:class:`bool`
+        
+        :param min_concurrency: lower bound for the adaptive limit
+        :type min_concurrency: :py:class:`int`
+        
+        :param increase: growth of the adaptive limit per round of
+            successful requests
+        :type increase: :py:class:`float`
+        
+        :param decrease: factor applied to the adaptive limit on throttling
+        :type decrease: :py:class:`float`
+        """
+        if adaptive and concurrency is None:
+            concurrency = 10
+        self.rate = rate
+        self.burst = max(burst or 1, 1)
+        self.concurrency = concurrency
+        self.adaptive = adaptive
+        self.min_concurrency = min_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = concurrency
+        self.in_flight = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self._tokens = self.burst
+        self._refilled = time.time()
+        self._decreased = 0
+        self._cond = threading.Condition(threading.Lock())
+    
+    def __repr__(self):
+        return ('<{module}.{cls}: rate={rate} concurrency={limit} '
+                'in_flight={in_flight}>').format(
+            module=self.__module__, cls=self.__class__.__name__,
+            rate=self.rate, limit=self._slots(), in_flight=self.in_flight)
+    
+    def _slots(self):
+        if self.limit is None:
+            return None
+        return max(int(self.limit), self.min_concurrency, 1)
+    
+    def acquire(self, deadline=None):
+        """
+        :param deadline: the active deadline, if any
+        :type deadline: :py:class:`smartdc.deadline.Deadline`
+        
+        :Returns: a ticket to hand to :py:meth:`release` once the request
+            has completed
+        :raises: :py:class:`smartdc.deadline.DeadlineExceeded` if the
+            request could not be sent before `deadline`
+        
+        Block until a request may be sent.
+        """
+        start = time.time()
+        with self._cond:
+            while self.limit is not None and self.in_flight >= self._slots():
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline.check()
+                self._cond.wait(timeout)
+            self.in_flight += 1
+            pause = 0
+            if self.rate:
+                now = time.time()
+                self._tokens = min(self.burst,
+                    self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                # take the token now, possibly going into debt, and wait
+                # (outside the lock) until it would have been refilled
+                self._tokens -= 1
+                if self._tokens < 0:
+                    pause = -self._tokens / self.rate
+                if (deadline is not None and pause and
+                        pause >= deadline.remaining()):
+                    self._tokens += 1
+                    self.in_flight -= 1
+                    self._cond.notify()
+                    raise DeadlineExceeded('Rate limit would delay the '
+                        'request past its deadline')
+            self.acquired += 1
+        if pause:
+            time.sleep(pause)
+        ticket = time.time()
+        with self._cond:
+            self.waited += ticket - start
+        return ticket
+    
+    def release(self, ticket, status=None):
+        """
+        :param ticket: as returned by :py:meth:`acquire`
+        :type ticket: :py:class:`float`
+        
+        :param status: status of the response, or ``None`` if the request
+            failed without one
+        :type status: :py:class:`int`
+        
+        Mark a request as completed, adjusting an adaptive limit to its
+        outcome.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                if self.adaptive and ticket >= self._decreased:
+                    self.limit = max(self.limit * self.decrease,
+                        self.min_concurrency)
+                    self._decreased = time.time()
+            elif self.adaptive and status is not None and status < 500:
+                self.limit = min(self.limit + self.increase / self.limit,
+                    self.concurrency)
+            self._cond.notify_all()
+    
+    def stats(self):
+        """
+        :Returns: the current concurrency limit and requests in flight,
+            with counts of requests sent and throttled and the total seconds
+            spent waiting
+        :rtype: :py:class:`dict`
+        """
+        with self._cond:
+            return {'rate': self.rate, 'limit': self._slots(),
+                    'in_flight': self.in_flight, 'acquired': self.acquired,
+                    'throttled': self.throttled, 'waited': self.waited}
+
+
+_shared_limiters = {}
+_shared_lock = threading.Lock()
+
+
+def rate_limiter(base_url, login, **kwargs):
+    """
+    :param base_url: protocol and hostname of the CloudAPI endpoint
+    :type base_url: :py:class:`basestring`
+    
+    :param login: user path in SmartDC
+    :type login: :py:class:`basestring`
+    
+    :rtype: :py:class:`smartdc.ratelimit.RateLimiter`
+    
+    :raises: :py:class:`ValueError` if the limiter already exists with
+        different settings
+    
+    Return the process-wide limiter for this endpoint and login, creating it
+    with the keyword arguments of :py:class:`smartdc.ratelimit.RateLimiter`
+    on first use; later calls must pass the same arguments to share it.
+    """
+    key = (base_url, login)
+    with _shared_lock:
+        entry = _shared_limiters.get(key)
+        if entry is None:
+            entry = (RateLimiter(**kwargs), kwargs)
+            _shared_limiters[key] = entry
+    limiter, settings = entry
+    if kwargs != settings:
+        raise ValueError('The rate limiter for {0} as {1} was created with '
+            '{2}, not {3}'.format(base_url, login, settings, kwargs))
+    return limiter
@@ -0,0 +1,152 @@
+import time
+import random
+
+__all__ = ['RetryPolicy', 'IDEMPOTENT_METHODS', 'RETRY_STATUSES']
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+"""Verbs that may be repeated without changing the outcome"""
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+"""Response statuses worth trying again"""
+
+
+def retry_after(value):
+    """
+    :param value: a ``Retry-After`` header: seconds, or an HTTP date
+    :type value: :py:class:`basestring`
+    
+    :Returns: seconds to wait, or ``None`` if `value` is missing or invalid
+    :rtype: :py:class:`float`
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    from email.utils import parsedate_tz, mktime_tz
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(mktime_tz(parsed) - time.time(), 0)
+
+
+class RetryPolicy(object):
+    """
+    When and how :py:meth:`smartdc.datacenter.DataCenter.request` sends a
+    request again after a transient failure.
+    
+    A request is retried, up to `retries` times, when it fails to connect,
+    times out or is reset, or when the response status is one of `statuses`,
+    as long as its verb is one of `methods`. A 429 (rate limited) response
+    is retried whatever the verb, as the server did not act on the request.
+    
+    The pause before the n-th retry is `backoff` * 2 ** (n - 1) seconds, up
+    to `max_backoff`, randomized by up to +/- `jitter` (a fraction of the
+    pause) so that many clients do not retry in step. A ``Retry-After``
+    header takes precedence, unless it asks for more than `max_backoff`, in
+    which case the response is returned as is. No retry is attempted if its
+    pause would outlast the active :py:class:`smartdc.deadline.Deadline`.
+    """
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, jitter=0.5,
+            methods=IDEMPOTENT_METHODS, statuses=RETRY_STATUSES,
+            honor_retry_after=True):
+        """
+        :param retries: maximum number of times to send a request again
+        :type retries: :py:class:`int`
+        
+        :param backoff: pause in seconds before the first retry
+        :type backoff: :py:class:`float`
+        
+        :param max_backoff: upper bound for the pause in seconds
+        :type max_backoff: :py:class:`float`
+        
+        :param jitter: maximum random variation, as a fraction of the pause
+        :type jitter: :py:class:`float`
+        
+        :param methods: verbs that are retried (default:
+            :py:data:`IDEMPOTENT_METHODS`)
+        :type methods: :py:class:`set` of :py:class:`str`\s
+        
+        :param statuses: response statuses that are retried (default:
+            :py:data:`RETRY_STATUSES`)
+        :type statuses: :py:class:`set` of :py:class:`int`\s
+        
+        :param honor_retry_after: whether to wait as long as a
+            ``Retry-After`` header asks
+        :type honor_retry_after: :py:class:`bool`
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.methods = frozenset(m.upper() for m in methods)
+        self.statuses = frozenset(statuses)
+        self.honor_retry_after = honor_retry_after
+    
+    def __repr__(self):
+        return ('<{module}.{cls}: retries={retries} backoff={backoff} '
+                'max_backoff={max_backoff}>').format(
+            module=self.__module__, cls=self.__class__.__name__,
+            retries=self.retries, backoff=self.backoff,
+            max_backoff=self.max_backoff)
+    
+    def retryable(self, method, status=None):
+        """
+        :param method: HTTP verb of the request
+        :type method: :py:class:`str`
+        
+        :param status: status of the response, or ``None`` if the request
+            failed with a connection error or timeout
+        :type status: :py:class:`int`
+        
+        :rtype: :py:class:`bool`
+        """
+        if status == 429 and status in self.statuses:
+            return True
+        if method.upper() not in self.methods:
+            return False
+        return status is None or status in self.statuses
+    
+    def delay(self, attempt, headers=None):
+        """
+        :param attempt: number of the retry about to be made, from 1
+        :type attempt: :py:class:`int`
+        
+        :param headers: headers of the response being retried, if any
+        :type headers: :py:class:`dict`
+        
+        :Returns: seconds to wait before retrying, or ``None`` if the server
+            asks for longer than `max_backoff`
+        :rtype: :py:class:`float`
+        """
+        if headers is not None and self.honor_retry_after:
+            after = retry_after(headers.get('retry-after'))
+            if after is not None:
+                return after if after <= self.max_backoff else None
+        pause = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        if self.jitter:
+            pause *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(pause, 0)
+    
+    def wait(self, attempt, method, status=None, headers=None, deadline=None):
+        """
+        :param attempt: number of retries made so far
+        :type attempt: :py:class:`int`
+        
+        :param deadline: the active deadline, if any
+        :type deadline: :py:class:`smartdc.deadline.Deadline`
+        
+        :Returns: seconds to wait before retrying a request that got
+            `status` (with `headers`), or ``None`` if it should not be
+            retried
+        :rtype: :py:class:`float`
+        """
+        if attempt >= self.retries or not self.retryable(method, status):
+            return None
+        pause = self.delay(attempt + 1, headers)
+        if pause is None:
+            return None
+        if deadline is not None and pause >= deadline.remaining():
+            return None
+        return pause
@@ -0,0 +1,698 @@
+from __future__ import print_function
+import json
+import time
+import random
+import socket
+import hashlib
+import threading
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit, parse_qsl, unquote
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit, parse_qsl
+    from urllib import unquote
+
+__all__ = ['CloudAPISimulator', 'SimulatedError']
+
+LOCATION = 'simulator'
+
+# the state that each transitional state settles into
+TRANSITIONS = {
+    'provisioning': 'running',
+    'stopping': 'stopped',
+    'rebooting': 'running',
+    'deleting': 'deleted',
+}
+
+
+def iso_time(t):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t)) + '.000Z'
+
+
+class SimulatedError(Exception):
+    """
+    Raised inside the simulator to answer a request with a CloudAPI-style
+    error body.
+    """
+    def __init__(self, status, code, message, headers=None):
+        super(SimulatedError, self).__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.headers = headers or {}
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def handle_error(self, request, client_address):
+        # clients that time out hang up mid-response; that is not an error
+        import sys
+        if not isinstance(sys.exc_info()[1], socket.error):
+            HTTPServer.handle_error(self, request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # send headers and body in one segment rather than stalling on Nagle's 
+    # algorithm and delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _handle(self):
+        sim = self.server.simulator
+        parts = urlsplit(self.path)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            raw = self.rfile.read(length)
+            try:
+                body = json.loads(raw.decode('utf-8'))
+            except ValueError:
+                body = None
+        status, data, headers = sim._serve(self.command,
+            unquote(parts.path), query, body, self.headers)
+        self._reply(status, data, headers)
+    
+    def _reply(self, status, data, headers):
+        if data is None:
+            data = b''
+        else:
+            headers.setdefault('Content-Type', 'application/json')
+            accept = self.headers.get('Accept-Encoding') or ''
+            if 'gzip' in accept and len(data) > 256:
+                import zlib
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+                data = compressor.compress(data) + compressor.flush()
+                headers['Content-Encoding'] = 'gzip'
+        if self.command == 'HEAD':
+            data = b''
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+    
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+
+class CloudAPISimulator(object):
+    """
+    An in-memory stand-in for CloudAPI, served over HTTP on localhost, for
+    exercising :py:class:`smartdc.datacenter.DataCenter` and
+    :py:class:`smartdc.machine.Machine` offline.
+    
+    It covers the endpoints this library calls: the account, keys,
+    datacenters, datasets, packages, images and networks catalogs
+    (answering ``If-None-Match`` with ``304 Not Modified``), and machines
+    with filtering, ``x-resource-count``/``x-query-limit`` paging, actions
+    and their state transitions, metadata, tags and snapshots. Responses
+    are gzipped when the client accepts it. Signatures are not checked.
+    
+    Every response can be delayed by a fixed `latency` plus a random
+    `jitter`, a fraction `error_rate` of requests fail with a ``503``, and
+    with a `rate_limit` the requests beyond it in any one second are
+    refused with a ``429`` and a ``Retry-After`` header. Random choices come
+    from a generator seeded with `seed`, so that a fleet and its failures
+    are reproducible.
+    
+    Usage::
+    
+        with CloudAPISimulator(fleet_size=5000, latency=0.02) as sim:
+            dc = sim.datacenter()
+            machines = dc.machines(workers=4)
+    """
+    def __init__(self, fleet_size=100, latency=0.0, jitter=0.0,
+            error_rate=0.0, rate_limit=None, transition_time=0.0,
+            page_limit=1000, seed=0, login='simulator', host='127.0.0.1',
+            port=0):
+        """
+        :param fleet_size: number of machines to start with
+        :type fleet_size: :py:class:`int`
+        
+        :param latency: seconds to wait before every response
+        :type latency: :py:class:`float`
+        
+        :param jitter: maximum random seconds added to the `latency`
+        :type jitter: :py:class:`float`
+        
+        :param error_rate: fraction of requests answered with a ``503``
+        :type error_rate: :py:class:`float`
+        
+        :param rate_limit: requests allowed per second before answering
+            ``429`` (default: unlimited)
+        :type rate_limit: :py:class:`int`
+        
+        :param transition_time: seconds that transitional states such as
+            ``provisioning`` or ``stopping`` last (``0`` completes them
+            on the next read)
+        :type transition_time: :py:class:`float`
+        
+        :param page_limit: the largest page of machines served, sent as
+            ``x-query-limit``
+        :type page_limit: :py:class:`int`
+        
+        :param seed: seed for the fleet, latency jitter and errors
+        :type seed: :py:class:`int`
+        
+        :param login: account login
+        :type login: :py:class:`basestring`
+        
+        :param host: address on which to listen
+        :type host: :py:class:`basestring`
+        
+        :param port: port on which to listen (default: any free port)
+        :type port: :py:class:`int`
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.transition_time = transition_time
+        self.page_limit = page_limit
+        self.login = login
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._window = (0, 0)
+        self._server = None
+        self._thread = None
+        self._catalogs()
+        self.machines = {}
+        """raw machine dicts by id, in creation order via `_order`"""
+        self._order = []
+        self._pending = {}
+        self._snapshots = {}
+        self._credentials = {}
+        for i in range(fleet_size):
+            self._provision({'name': 'machine-{0}'.format(i),
+                'tags': {'role': ('web', 'db', 'cache')[i % 3]}},
+                state='running' if i % 10 else 'stopped')
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} machines at {url}>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            n=len(self.machines), url=self.url if self._server else None)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+    
+    @property
+    def url(self):
+        """Base URL of the running server"""
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+    
+    def start(self):
+        """
+        Start serving from a background thread.
+        
+        :Returns: the simulator itself
+        """
+        if self._server is None:
+            self._server = _Server((self.host, self.port), _Handler)
+            self._server.simulator = self
+            self._thread = threading.Thread(
+                target=self._server.serve_forever)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        """
+        Stop serving and close the listening socket.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = self._thread = None
+    
+    def datacenter(self, **kwargs):
+        """
+        :rtype: :py:class:`smartdc.datacenter.DataCenter`
+        
+        A DataCenter pointed at this simulator. Keyword arguments are passed
+        on to its constructor.
+        """
+        from .datacenter import DataCenter
+        kwargs.setdefault('login', self.login)
+        return DataCenter(location=LOCATION,
+            known_locations={LOCATION: self.url}, **kwargs)
+    
+    def stats(self):
+        """
+        :Returns: the number of requests served, failed on purpose and
+            throttled
+        :rtype: :py:class:`dict`
+        """
+        return {'requests': self.requests, 'errors': self.errors,
+                'throttled': self.throttled}
+    
+    # fixtures
+    
+    def _catalogs(self):
+        rand = self._random
+        self.account = {'id': self._uuid(), 'login': self.login,
+            'email': self.login + '@example.com', 'companyName': 'Example',
+            'firstName': 'Sim', 'lastName': 'Ulator',
+            'created': iso_time(1350000000),
+            'updated': iso_time(1350000000)}
+        self.keys = [{'name': 'id_rsa', 'key': 'ssh-rsa AAAAB3Nza... sim',
+            'fingerprint': ':'.join('%02x' % rand.randint(0, 255)
+                                    for _ in range(16))}]
+        self.datasets = []
+        self.images = []
+        for os, name, version, kind in [
+                ('smartos', 'base64', '13.1.0', 'smartmachine'),
+                ('smartos', 'standard64', '13.1.0', 'smartmachine'),
+                ('linux', 'ubuntu-12.04', '2.4.2', 'virtualmachine'),
+                ('linux', 'centos-6', '2.4.2', 'virtualmachine')]:
+            image = {'id': self._uuid(), 'name': name, 'version': version,
+                'os': os, 'type': kind, 'public': True, 'state': 'active',
+                'owner': self._uuid(), 'requirements': {},
+                'published_at': iso_time(1370000000)}
+            self.images.append(image)
+            self.datasets.append({'id': image['id'],
+                'urn': 'sdc:sdc:{0}:{1}'.format(name, version),
+                'name': name, 'os': os, 'type': kind, 'version': version,
+                'description': '{0} {1}'.format(name, version),
+                'default': not self.datasets,
+                'created': iso_time(1370000000)})
+        self.packages = []
+        for size, memory in [('small', 1024), ('medium', 4096),
+                             ('large', 16384)]:
+            self.packages.append({'id': self._uuid(),
+                'name': 'g3-standard-{0}-smartos'.format(size),
+                'memory': memory, 'disk': memory * 32, 'swap': memory * 2,
+                'vcpus': memory // 1024, 'version': '1.0.0',
+                'group': 'Standard', 'default': 'true' if size == 'small'
+                else 'false'})
+        self.networks = [
+            {'id': self._uuid(), 'name': 'external', 'public': True,
+             'description': 'Public internet'},
+            {'id': self._uuid(), 'name': 'internal', 'public': False,
+             'description': 'Private network'}]
+    
+    def _uuid(self):
+        h = '%032x' % self._random.getrandbits(128)
+        return '-'.join((h[:8], h[8:12], '4' + h[13:16], h[16:20], h[20:]))
+    
+    def _provision(self, params, state='provisioning'):
+        rand = self._random
+        package = self._find(self.packages, params.get('package'), 'name') \
+            or self.packages[0]
+        image_id = params.get('image') or params.get('dataset')
+        image = (self._find(self.images, image_id, 'id') or
+                 self._find(self.datasets, image_id, 'urn') or
+                 self.images[len(self.machines) % len(self.images)])
+        dataset = self._find(self.datasets, image['id'], 'id')
+        now = time.time()
+        n = len(self._order)
+        machine_id = self._uuid()
+        metadata = dict((k[len('metadata.'):], v) for k, v in params.items()
+                        if k.startswith('metadata.'))
+        metadata.update(params.get('metadata') or {})
+        tags = dict((k[len('tag.'):], v) for k, v in params.items()
+                    if k.startswith('tag.'))
+        tags.update(params.get('tags') or {})
+        machine = {
+            'id': machine_id,
+            'name': params.get('name') or machine_id[:8],
+            'type': image['type'],
+            'state': state,
+            'dataset': dataset['urn'],
+            'image': image['id'],
+            'package': package['name'],
+            'memory': package['memory'],
+            'disk': package['disk'],
+            'ips': ['10.{0}.{1}.{2}'.format(n >> 16 & 255, n >> 8 & 255,
+                                            n & 255),
+                    '165.225.{0}.{1}'.format(rand.randint(128, 191),
+                                              rand.randint(1, 254))],
+            'metadata': metadata,
+            'tags': tags,
+            'created': iso_time(now),
+            'updated': iso_time(now),
+        }
+        machine['primaryIp'] = machine['ips'][1]
+        self.machines[machine_id] = machine
+        self._order.append(machine_id)
+        self._snapshots[machine_id] = {}
+        self._credentials[machine_id] = {'root': 'secret-{0}'.format(n)}
+        if state in TRANSITIONS:
+            self._transition(machine, state)
+        return machine
+    
+    @staticmethod
+    def _find(items, value, field):
+        if value is None:
+            return None
+        for item in items:
+            if item.get(field) == value or item.get('id') == value:
+                return item
+        return None
+    
+    # state transitions
+    
+    def _transition(self, resource, state, then=None):
+        resource['state'] = state
+        resource['updated'] = iso_time(time.time())
+        self._pending[id(resource)] = (then or TRANSITIONS[state],
+                                       time.time() + self.transition_time)
+    
+    def _advance(self, resource):
+        pending = self._pending.get(id(resource))
+        if pending is not None and time.time() >= pending[1]:
+            del self._pending[id(resource)]
+            resource['state'] = pending[0]
+            resource['updated'] = iso_time(pending[1])
+        return resource
+    
+    def _machine(self, machine_id):
+        machine = self.machines.get(machine_id)
+        if machine is None:
+            raise SimulatedError(404, 'ResourceNotFound',
+                'machine {0} not found'.format(machine_id))
+        return self._advance(machine)
+    
+    def _require(self, machine, *states):
+        if machine['state'] not in states:
+            raise SimulatedError(409, 'InvalidState',
+                'machine is {0}, not {1}'.format(machine['state'],
+                    ' or '.join(states)))
+    
+    # request handling
+    
+    def handle(self, method, path, query, body, headers):
+        """
+        :Returns: the status, JSON-serializable body and headers with which
+            to answer a request
+        
+        The HTTP server answers every request through :py:meth:`_serve`,
+        of which this is the decoded form, handy to call directly in tests.
+        """
+        status, data, extra = self._serve(method, path, query, body, headers)
+        if data is not None:
+            data = json.loads(data.decode('utf-8'))
+        return status, data, extra
+    
+    def _serve(self, method, path, query, body, headers):
+        """
+        :Returns: the status, JSON-encoded body (or ``None``) and headers
+            with which to answer a request
+        
+        The body is encoded while the lock is held, as it may share dicts
+        with the fleet that other requests are changing.
+        """
+        self._delay()
+        with self._lock:
+            self.requests += 1
+            try:
+                self._throttle()
+                if self.error_rate and self._random.random() < self.error_rate:
+                    self.errors += 1
+                    raise SimulatedError(503, 'ServiceUnavailable',
+                        'simulated failure')
+                status, payload, extra = self._route(method, path, query,
+                    body, headers)
+            except SimulatedError as e:
+                status, extra = e.status, dict(e.headers)
+                payload = {'code': e.code, 'message': e.message}
+            data = None
+            if payload is not None and status != 304:
+                data = json.dumps(payload).encode('utf-8')
+        return status, data, extra
+    
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _throttle(self):
+        if not self.rate_limit:
+            return
+        second = int(time.time())
+        start, count = self._window
+        if start != second:
+            start, count = second, 0
+        count += 1
+        self._window = (start, count)
+        if count > self.rate_limit:
+            self.throttled += 1
+            raise SimulatedError(429, 'RequestThrottled',
+                'too many requests', headers={'Retry-After': '1'})
+    
+    def _route(self, method, path, query, body, headers):
+        segments = [s for s in path.split('/') if s]
+        if not segments:
+            return 200, {'endpoints': ['GET /:login/machines']}, {}
+        if segments[0] not in (self.login, 'my'):
+            raise SimulatedError(404, 'ResourceNotFound',
+                'unknown login {0}'.format(segments[0]))
+        rest = segments[1:]
+        if not rest:
+            if method == 'POST':
+                self.account.update(query)
+                self.account.update(body or {})
+            return 200, self.account, {}
+        collection = rest[0]
+        if collection == 'machines':
+            return self._machines_route(method, rest[1:], query, body,
+                                        headers)
+        if collection == 'datacenters':
+            datacenters = {LOCATION: self.url}
+            if len(rest) > 1:
+                if rest[1] not in datacenters:
+                    raise SimulatedError(404, 'ResourceNotFound',
+                        'datacenter {0} not found'.format(rest[1]))
+                return 302, {'code': 'ResourceMoved',
+                    'message': datacenters[rest[1]]}, \
+                    {'Location': datacenters[rest[1]]}
+            return self._conditional(datacenters, headers)
+        if collection == 'keys':
+            return self._keys_route(method, rest[1:], body, headers)
+        catalog = {'datasets': (self.datasets, 'id'),
+                   'images': (self.images, 'id'),
+                   'packages': (self.packages, 'name'),
+                   'networks': (self.networks, 'id')}.get(collection)
+        if catalog is None:
+            raise SimulatedError(404, 'ResourceNotFound',
+                'no such endpoint {0}'.format(path))
+        items, field = catalog
+        if len(rest) > 1:
+            item = self._find(items, rest[1], field)
+            if item is None:
+                raise SimulatedError(404, 'ResourceNotFound',
+                    '{0} {1} not found'.format(collection, rest[1]))
+            if method == 'DELETE':
+                items.remove(item)
+                return 204, None, {}
+            return 200, item, {}
+        return self._conditional(self._filter(items, query), headers)
+    
+    @staticmethod
+    def _filter(items, query):
+        def matches(item):
+            for k, v in query.items():
+                if k in item and str(item[k]).lower() != str(v).lower():
+                    return False
+            return True
+        return [i for i in items if matches(i)]
+    
+    @staticmethod
+    def _conditional(payload, headers):
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True)
+                              .encode('utf-8')).hexdigest()
+        etag = '"{0}"'.format(digest)
+        if headers.get('If-None-Match') == etag:
+            return 304, None, {'ETag': etag}
+        return 200, payload, {'ETag': etag}
+    
+    def _keys_route(self, method, rest, body, headers):
+        if not rest:
+            if method == 'POST':
+                key = {'name': body.get('name'), 'key': body.get('key'),
+                       'fingerprint': 'sim:' + str(len(self.keys))}
+                self.keys.append(key)
+                return 201, key, {}
+            return self._conditional(self.keys, headers)
+        key = self._find(self.keys, rest[0], 'name')
+        if key is None:
+            raise SimulatedError(404, 'ResourceNotFound',
+                'key {0} not found'.format(rest[0]))
+        if method == 'DELETE':
+            self.keys.remove(key)
+            return 204, None, {}
+        return 200, key, {}
+    
+    def _listing(self, query):
+        tags = dict((k[len('tag.'):], v) for k, v in query.items()
+                    if k.startswith('tag.'))
+        fields = ('type', 'name', 'state', 'memory', 'dataset', 'image',
+                  'package')
+        selected = []
+        for machine_id in self._order:
+            m = self._advance(self.machines[machine_id])
+            if m['state'] == 'deleted' and not query.get('tombstone'):
+                continue
+            if any(f in query and str(m[f]) != query[f] for f in fields):
+                continue
+            if any(str(m['tags'].get(k)) != v for k, v in tags.items()):
+                continue
+            selected.append(m)
+        return selected
+    
+    def _render(self, machine, query):
+        if query.get('credentials') in ('true', 'True', '1'):
+            machine = dict(machine, metadata=dict(machine['metadata'],
+                credentials=self._credentials[machine['id']]))
+        return machine
+    
+    def _machines_route(self, method, rest, query, body, headers):
+        if not rest:
+            if method == 'POST':
+                params = dict(query)
+                params.update(body or {})
+                return 201, self._provision(params), {}
+            selected = self._listing(query)
+            limit = min(int(query.get('limit') or self.page_limit),
+                        self.page_limit)
+            offset = int(query.get('offset') or 0)
+            page = [self._render(m, query)
+                    for m in selected[offset:offset + limit]]
+            return 200, page, {'x-resource-count': str(len(selected)),
+                               'x-query-limit': str(limit)}
+        machine = self._machine(rest[0])
+        if machine['state'] == 'deleted':
+            # as CloudAPI does, show the tombstone with a 410 Gone
+            if len(rest) == 1 and method in ('GET', 'HEAD'):
+                return 410, self._render(machine, query), {}
+            if method != 'DELETE':
+                raise SimulatedError(410, 'ResourceNotFound',
+                    'machine {0} has been deleted'.format(rest[0]))
+        if len(rest) == 1:
+            if method == 'POST':
+                return self._action(machine, query.get('action'), query)
+            if method == 'DELETE':
+                if machine['state'] != 'deleted':
+                    self._transition(machine, 'deleting')
+                return 204, None, {}
+            return 200, self._render(machine, query), {}
+        if rest[1] == 'metadata':
+            return self._metadata_route(method, machine, rest[2:], body)
+        if rest[1] == 'tags':
+            return self._tags_route(method, machine, rest[2:], body)
+        if rest[1] == 'snapshots':
+            return self._snapshots_route(method, machine, rest[2:], body)
+        raise SimulatedError(404, 'ResourceNotFound',
+            'no such endpoint {0}'.format('/'.join(rest)))
+    
+    def _action(self, machine, action, query):
+        if action == 'stop':
+            self._require(machine, 'running')
+            self._transition(machine, 'stopping')
+        elif action == 'start':
+            self._require(machine, 'stopped')
+            self._transition(machine, 'stopped', then='running')
+        elif action == 'reboot':
+            self._require(machine, 'running')
+            self._transition(machine, 'rebooting')
+        elif action == 'resize':
+            package = self._find(self.packages, query.get('package'), 'name')
+            if package is None:
+                raise SimulatedError(409, 'InvalidArgument',
+                    'unknown package {0}'.format(query.get('package')))
+            machine.update(package=package['name'],
+                memory=package['memory'], disk=package['disk'],
+                updated=iso_time(time.time()))
+        elif action == 'rename':
+            machine.update(name=query.get('name'),
+                updated=iso_time(time.time()))
+        else:
+            raise SimulatedError(409, 'InvalidArgument',
+                'unknown action {0}'.format(action))
+        return 202, None, {}
+    
+    def _metadata_route(self, method, machine, rest, body):
+        metadata = machine['metadata']
+        if rest:
+            if method == 'DELETE':
+                metadata.pop(rest[0], None)
+                return 204, None, {}
+            if rest[0] not in metadata:
+                raise SimulatedError(404, 'ResourceNotFound',
+                    'metadata key {0} not found'.format(rest[0]))
+            return 200, metadata[rest[0]], {}
+        if method == 'POST':
+            metadata.update(body or {})
+        elif method == 'DELETE':
+            metadata.clear()
+            return 204, None, {}
+        return 200, metadata, {}
+    
+    def _tags_route(self, method, machine, rest, body):
+        tags = machine['tags']
+        if rest:
+            if method == 'DELETE':
+                tags.pop(rest[0], None)
+                return 204, None, {}
+            if rest[0] not in tags:
+                raise SimulatedError(404, 'ResourceNotFound',
+                    'tag {0} not found'.format(rest[0]))
+            return 200, tags[rest[0]], {}
+        if method in ('POST', 'PUT'):
+            if method == 'PUT':
+                tags.clear()
+            tags.update(body or {})
+        elif method == 'DELETE':
+            tags.clear()
+            return 204, None, {}
+        return 200, tags, {}
+    
+    def _snapshots_route(self, method, machine, rest, body):
+        snapshots = self._snapshots[machine['id']]
+        if not rest:
+            if method == 'POST':
+                name = (body or {}).get('name') or \
+                    time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+                now = iso_time(time.time())
+                snapshot = {'name': name, 'state': 'queued',
+                            'created': now, 'updated': now}
+                snapshots[name] = snapshot
+                self._transition(snapshot, 'queued', then='success')
+                return 201, snapshot, {}
+            return 200, [self._advance(s) for s in snapshots.values()], {}
+        snapshot = snapshots.get(rest[0])
+        if snapshot is None:
+            raise SimulatedError(404, 'ResourceNotFound',
+                'snapshot {0} not found'.format(rest[0]))
+        if method == 'DELETE':
+            self._pending.pop(id(snapshot), None)
+            del snapshots[rest[0]]
+            return 204, None, {}
+        if method == 'POST':
+            self._require(machine, 'stopped')
+            self._transition(machine, 'stopped', then='running')
+            return 202, None, {}
+        return 200, self._advance(snapshot), {}
@@ -0,0 +1,247 @@
+import io
+import json
+import time
+import threading
+
+__all__ = ['RecordingSession', 'ReplaySession', 'ReplayError']
+
+# response headers worth keeping; the rest only bloat a recording
+RECORDED_HEADERS = ('content-type', 'x-resource-count', 'x-query-limit',
+                    'etag', 'last-modified', 'location', 'retry-after')
+
+
+def _open(path, mode):
+    """
+    Open a recording as UTF-8 text for reading (``'r'``) or appending 
+    (``'a'``), gzipped if its name ends in ``.gz``.
+    """
+    if path.endswith('.gz'):
+        import gzip
+        f = gzip.open(path, mode + 'b')
+        if mode == 'r':
+            # Python 2's GzipFile lacks the read1() TextIOWrapper relies on
+            f = io.BufferedReader(f)
+        return io.TextIOWrapper(f, encoding='utf-8')
+    return io.open(path, mode, encoding='utf-8')
+
+
+def _split(url):
+    """
+    :Returns: the path and query parameters of `url`, leaving out the
+        scheme and host so that a recording can be replayed anywhere
+    """
+    try:
+        from urllib.parse import urlsplit, parse_qsl
+    except ImportError:
+        from urlparse import urlsplit, parse_qsl
+    parts = urlsplit(url)
+    return parts.path, parse_qsl(parts.query, keep_blank_values=True)
+
+
+def _key(method, path, params):
+    return (method.upper(), path, tuple(sorted(params)))
+
+
+class ReplayError(RuntimeError):
+    """
+    Raised when a request has no recorded exchange left to replay.
+    """
+    pass
+
+
+class RecordingSession(object):
+    """
+    A stand-in for :py:class:`requests.Session` that passes requests on to a
+    real session and appends every exchange (method, path, query, status,
+    selected headers, body, start time relative to the first request, and
+    elapsed time) to a file, one JSON object per line. Files ending in
+    ``.gz`` are gzipped.
+    
+    Pass it as the `session` of a :py:class:`smartdc.datacenter.DataCenter`::
+    
+        dc = DataCenter(location='us-east-1', key_id=...,
+                        session=RecordingSession('traffic.jsonl.gz'))
+    
+    Bodies are stored decoded, so the recording is independent of
+    compression, and request signatures are not stored.
+    """
+    def __init__(self, path, session=None):
+        """
+        :param path: file to which exchanges are appended
+        :type path: :py:class:`basestring`
+        
+        :param session: session that makes the real requests (default: a
+            new :py:class:`requests.Session`)
+        :type session: :py:class:`requests.Session`
+        """
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.path = path
+        self.session = session
+        self.recorded = 0
+        self._file = None
+        self._start = None
+        self._lock = threading.Lock()
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} exchanges to {path}>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            n=self.recorded, path=self.path)
+    
+    def request(self, method, url, params=None, data=None, **kwargs):
+        start = time.time()
+        resp = self.session.request(method, url, params=params, data=data,
+            **kwargs)
+        # reading the body here means a recorded stream arrives all at once
+        content = resp.content
+        elapsed = time.time() - start
+        path, query = _split(resp.request.url if resp.request else url)
+        exchange = {
+            'method': method.upper(),
+            'path': path,
+            'params': query,
+            'status': resp.status_code,
+            'headers': dict((h, resp.headers[h]) for h in RECORDED_HEADERS
+                            if h in resp.headers),
+            'body': content.decode('utf-8') if content else '',
+            'elapsed': round(elapsed, 6),
+        }
+        with self._lock:
+            if self._file is None:
+                self._file = _open(self.path, 'a')
+                self._start = start
+            exchange['at'] = round(start - self._start, 6)
+            line = json.dumps(exchange, separators=(',', ':'))
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            self._file.write(line + u'\n')
+            self._file.flush()
+            self.recorded += 1
+        return resp
+    
+    def mount(self, prefix, adapter):
+        self.session.mount(prefix, adapter)
+    
+    def close(self):
+        """
+        Close the recording (reopened for appending if more requests follow)
+        and the wrapped session.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.session.close()
+
+
+class ReplaySession(object):
+    """
+    A stand-in for :py:class:`requests.Session` that answers requests from
+    a file written by :py:class:`smartdc.transport.RecordingSession`,
+    without touching the network.
+    
+    Each request is matched on its method, path and query against the
+    recorded exchanges, which are served in their recorded order; repeated
+    requests (such as polls) therefore replay the successive answers they
+    originally got. Requests are still prepared and signed (if the
+    DataCenter has credentials), so that CPU time and call counts are
+    comparable to live traffic. With `timing`, each response is delayed by
+    its recorded elapsed time, and not returned before it was in the
+    recording, counting from the first request, so that the pauses between
+    requests are reproduced too; `speed` divides both.
+    """
+    def __init__(self, path, timing=False, speed=1.0, strict=True):
+        """
+        :param path: recording to replay
+        :type path: :py:class:`basestring`
+        
+        :param timing: whether to reproduce the recorded response times
+        :type timing: :py:class:`bool`
+        
+        :param speed: factor by which to speed up the recorded timing
+        :type speed: :py:class:`float`
+        
+        :param strict: whether a request with no exchange left raises
+            :py:class:`smartdc.transport.ReplayError`, rather than being
+            answered again with the last matching exchange
+        :type strict: :py:class:`bool`
+        """
+        self.path = path
+        self.timing = timing
+        self.speed = speed
+        self.strict = strict
+        self.calls = 0
+        self._exchanges = {}
+        self._last = {}
+        self._started = None
+        self._lock = threading.Lock()
+        with _open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                e = json.loads(line)
+                key = _key(e['method'], e['path'],
+                           [tuple(p) for p in e['params']])
+                self._exchanges.setdefault(key, []).append(e)
+        for queue in self._exchanges.values():
+            queue.reverse()
+    
+    def __repr__(self):
+        return '<{module}.{cls}: {n} calls from {path}>'.format(
+            module=self.__module__, cls=self.__class__.__name__,
+            n=self.calls, path=self.path)
+    
+    def request(self, method, url, params=None, data=None, headers=None,
+            auth=None, **kwargs):
+        import requests
+        prepared = requests.Request(method, url, params=params, data=data,
+            headers=headers, auth=auth).prepare()
+        path, query = _split(prepared.url)
+        key = _key(method, path, query)
+        with self._lock:
+            if self._started is None:
+                self._started = time.time()
+            self.calls += 1
+            queue = self._exchanges.get(key)
+            if queue:
+                exchange = queue.pop()
+                self._last[key] = exchange
+            elif not self.strict and key in self._last:
+                exchange = self._last[key]
+            else:
+                raise ReplayError('No recorded response for {0} {1}'.format(
+                    method, prepared.url))
+        if self.timing:
+            at, elapsed = exchange.get('at', 0), exchange['elapsed']
+            due = self._started + (at + elapsed) / self.speed
+            pause = max(elapsed / self.speed, due - time.time())
+            if pause > 0:
+                time.sleep(pause)
+        resp = requests.Response()
+        resp.status_code = exchange['status']
+        resp.headers.update(exchange['headers'])
+        resp._content = exchange['body'].encode('utf-8')
+        resp._content_consumed = True
+        resp.url = prepared.url
+        resp.request = prepared
+        try:
+            from http.client import responses
+        except ImportError:
+            from httplib import responses
+        resp.reason = responses.get(resp.status_code, '')
+        return resp
+    
+    def remaining(self):
+        """
+        :Returns: the number of recorded exchanges not yet replayed
+        :rtype: :py:class:`int`
+        """
+        with self._lock:
+            return sum(len(q) for q in self._exchanges.values())
+    
+    def mount(self, prefix, adapter):
+        pass
+    
+    def close(self):
+        pass
@@ -0,0 +1,124 @@
+import threading
+import unittest
+
+from smartdc.auth import (CachedSignatureAuth, AgentKeyMemory,
+    agent_fingerprint, order_agent_keys)
+from smartdc.datacenter import DataCenter
+
+
+class FakeAgentKey(object):
+    def __init__(self, name):
+        self.name = name
+
+    def get_fingerprint(self):
+        return self.name.encode('ascii')
+
+
+class FakeSigner(object):
+    def __init__(self, keys):
+        self._agent_key = keys[0]
+        self._keys = keys[1:]
+
+
+class FakeSignatureAuth(object):
+    """
+    Signs with the name of the signer's current agent key.
+    """
+    headers = None
+    key_id = '/test/keys/id'
+
+    def __init__(self, keys):
+        self.signer = FakeSigner(keys)
+
+    def __call__(self, r):
+        r.headers['Authorization'] = 'Signature ' + self.signer._agent_key.name
+        return r
+
+
+class Response(object):
+    def __init__(self, status):
+        self.status_code = status
+        self.headers = {'content-type': 'application/json'}
+        self.content = b'{}'
+        self.raw = None
+
+    def close(self):
+        pass
+
+
+class KeyCheckingSession(object):
+    """
+    Accepts only requests signed with the `accepted` key, recording the key
+    of every request.
+    """
+    def __init__(self, accepted):
+        self.accepted = accepted
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def request(self, method, url, auth=None, headers=None, **kwargs):
+        class Prepared(object):
+            pass
+        r = Prepared()
+        r.headers = dict(headers)
+        auth(r)
+        name = r.headers['Authorization'].split()[-1]
+        with self.lock:
+            self.seen.append(name)
+        return Response(200 if name in self.accepted else 401)
+
+
+def datacenter(auth, session, memory):
+    dc = DataCenter(location='test', known_locations={'test': 'http://test'},
+                    login='tester', session=session, key_memory=memory,
+                    retry=False)
+    dc.auth = auth
+    return dc
+
+
+class AgentKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = [FakeAgentKey(n) for n in ('a', 'b', 'c')]
+        self.auth = CachedSignatureAuth(FakeSignatureAuth(self.keys))
+
+    def test_order_agent_keys(self):
+        c = agent_fingerprint(self.keys[2])
+        self.assertEqual([k.name for k in order_agent_keys(self.keys, c)],
+                         ['c', 'a', 'b'])
+        self.assertEqual([k.name for k in order_agent_keys(self.keys, 'zz')],
+                         ['a', 'b', 'c'])
+
+    def test_falls_back_without_discarding_keys(self):
+        memory = AgentKeyMemory()
+        session = KeyCheckingSession(['c'])
+        dc = datacenter(self.auth, session, memory)
+        dc.request('GET', '/keys')
+        self.assertEqual(session.seen, ['a', 'b', 'c'])
+        # the working key is remembered, and the shared key list is intact
+        dc.request('GET', '/keys')
+        self.assertEqual(session.seen[-1], 'c')
+        self.assertEqual([k.name for k in self.auth.agent_keys],
+                         ['a', 'b', 'c'])
+        self.assertEqual(dc.metrics.retries, {('GET', '/keys'): 2})
+
+    def test_datacenters_keep_their_own_keys(self):
+        sessions = {}
+        dcs = []
+        for name in ('a', 'b', 'c'):
+            memory = AgentKeyMemory()
+            memory.remember('http://test', 'tester',
+                            agent_fingerprint(FakeAgentKey(name)))
+            sessions[name] = KeyCheckingSession([name])
+            dcs.append(datacenter(self.auth, sessions[name], memory))
+
+        def run(dc):
+            for _ in range(200):
+                dc.request('GET', '/machines')
+        threads = [threading.Thread(target=run, args=(dc,)) for dc in dcs]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for name, session in sessions.items():
+            self.assertEqual(set(session.seen), set([name]))
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from smartdc.auth import AgentKeyMemory
+from smartdc.cache import ResponseCache, DiskCache
+from smartdc.simulator import CloudAPISimulator
+
+
+class KeyOnlyAuth(object):
+    def __init__(self, key_id):
+        self.key_id = key_id
+
+    def __call__(self, r):
+        return r
+
+
+class CatalogCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=1)
+        self.sim.start()
+        self.cache = ResponseCache(ttl=300)
+        self.dcs = []
+
+    def tearDown(self):
+        for dc in self.dcs:
+            dc.session.close()
+        self.sim.stop()
+
+    def datacenter(self, key_id, login='my'):
+        dc = self.sim.datacenter(login=login, cache_ttl=300)
+        dc.cache = self.cache
+        dc.auth = KeyOnlyAuth(key_id)
+        self.dcs.append(dc)
+        return dc
+
+    def test_my_login_is_keyed_by_account(self):
+        alice = self.datacenter('/alice/keys/a')
+        bob = self.datacenter('/bob/keys/b')
+        self.assertEqual(alice.url, bob.url)
+        alice.packages()
+        alice.packages()
+        bob.packages()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_stale_entry_is_revalidated(self):
+        dc = self.datacenter('/simulator/keys/a', login='simulator')
+        self.cache.ttl = 0.05
+        packages = dc.packages()
+        time.sleep(0.1)
+        before = self.sim.requests
+        self.assertEqual(dc.packages(), packages)
+        self.assertEqual(self.sim.requests - before, 1)
+        self.assertEqual(self.cache.stats()['revalidations'], 1)
+        statuses = dc.metrics.as_dict()['endpoints']['GET /packages']
+        self.assertEqual(statuses['statuses'], {'200': 1, '304': 1})
+
+    def test_fresh_entry_is_not_revalidated(self):
+        dc = self.datacenter('/simulator/keys/a', login='simulator')
+        dc.packages()
+        before = self.sim.requests
+        dc.packages()
+        self.assertEqual(self.sim.requests, before)
+        self.assertEqual(self.cache.stats()['revalidations'], 0)
+
+    def test_named_login_is_shared(self):
+        first = self.datacenter('/simulator/keys/a', login='simulator')
+        second = self.datacenter('/simulator/keys/b', login='simulator')
+        first.packages()
+        second.packages()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_accounts_get_separate_files(self):
+        class Response(object):
+            headers = {'etag': '"1"'}
+        cache = DiskCache(self.directory)
+        for account in ('alice', 'bob'):
+            key = cache.key('http://test/my/packages', None, account)
+            cache.store(key, [account], Response())
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        other = DiskCache(self.directory)
+        key = other.key('http://test/my/packages', None, 'bob')
+        self.assertEqual(other.lookup(key), (['bob'], {}))
+
+    def test_key_memory_is_shared_through_the_file(self):
+        path = os.path.join(self.directory, 'keys', 'agent.json')
+        AgentKeyMemory(path).remember('http://test', 'tester', 'aa:bb')
+        self.assertEqual(os.listdir(os.path.dirname(path)), ['agent.json'])
+        self.assertEqual(AgentKeyMemory(path).get('http://test', 'tester'),
+                         'aa:bb')
+
+
+if __name__ == '__main__':
+    unittest.main()
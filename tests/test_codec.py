@@ -0,0 +1,134 @@
+import json
+import unittest
+
+from smartdc import datacenter
+from smartdc.codec import iter_json_array, json_decoder
+from smartdc.simulator import CloudAPISimulator
+
+
+def splits(body):
+    """
+    Every way of cutting `body` into three chunks.
+    """
+    for i in range(len(body) + 1):
+        for j in range(i, len(body) + 1):
+            yield [body[:i], body[i:j], body[j:]]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def assertParsesInChunks(self, text):
+        expected = json.loads(text)
+        for chunks in splits(text.encode('utf-8')):
+            self.assertEqual(list(iter_json_array(chunks)), expected,
+                             'chunks: {0!r}'.format(chunks))
+
+    def test_whole(self):
+        self.assertEqual(list(iter_json_array([b'[1, "a", {"b": null}]'])),
+                         [1, 'a', {'b': None}])
+
+    def test_empty(self):
+        self.assertParsesInChunks('[ ]')
+
+    def test_floats(self):
+        self.assertParsesInChunks('[15000000000.0, 3.25, 12]')
+
+    def test_exponents(self):
+        self.assertParsesInChunks('[1e5, 2.5E-3, 7e+2]')
+
+    def test_negative_zero(self):
+        self.assertParsesInChunks('[-0.0, -0.5, -0]')
+
+    def test_mixed(self):
+        self.assertParsesInChunks(
+            '[ {"ips": ["10.0.0.1"], "memory": 1024.5}, "x", true, null ]')
+
+    def test_multibyte(self):
+        self.assertParsesInChunks(u'["\u00e9t\u00e9", "\u2603"]')
+
+    def test_missing_comma(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1 2]']))
+
+    def test_trailing_comma(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1,', b']']))
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1, {"a": ']))
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"a": 1}']))
+
+    def test_empty_body(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'']))
+
+
+class JsonDecoderTest(unittest.TestCase):
+
+    def test_stdlib_accepts_bytes(self):
+        name, loads = json_decoder('json')
+        self.assertEqual(name, 'json')
+        self.assertEqual(loads(b'{"a": [1]}'), {'a': [1]})
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            json_decoder('yaml')
+
+
+class StreamedListingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=7, page_limit=3)
+        self.sim.start()
+        # uncompressed, so that chunks are cut exactly at each size
+        self.dc = self.sim.datacenter(compress=False)
+        self.chunk_size = datacenter.STREAM_CHUNK_SIZE
+
+    def tearDown(self):
+        datacenter.STREAM_CHUNK_SIZE = self.chunk_size
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_chunk_sizes(self):
+        expected = [m.id for m in self.dc.machines()]
+        for size in (1, 2, 3, 7, 64, 4096):
+            datacenter.STREAM_CHUNK_SIZE = size
+            streamed = self.dc.iter_machines(stream=True)
+            self.assertEqual([m.id for m in streamed], expected,
+                             'chunk size {0}'.format(size))
+
+    def test_streamed_request(self):
+        expected, _ = self.dc.request('GET', '/packages')
+        for size in (1, 5, 4096):
+            datacenter.STREAM_CHUNK_SIZE = size
+            items, _ = self.dc.request('GET', '/packages', stream=True)
+            self.assertEqual(list(items), expected)
+
+    def test_streamed_bytes_are_counted(self):
+        self.dc.machines()
+        read = self.dc.metrics.as_dict()['endpoints']['GET /machines']
+        self.assertTrue(read['bytes_received'] > 0)
+        datacenter.STREAM_CHUNK_SIZE = 100
+        self.assertEqual(len(list(self.dc.iter_machines(stream=True))), 7)
+        both = self.dc.metrics.as_dict()['endpoints']['GET /machines']
+        self.assertEqual(both['bytes_received'], 2 * read['bytes_received'])
+        self.assertEqual(both['wire_bytes_received'], both['bytes_received'])
+
+    def test_compressed_stream_counts_wire_bytes(self):
+        dc = self.sim.datacenter(compress=True)
+        try:
+            dc.machines()
+            read = dc.metrics.as_dict()['endpoints']['GET /machines']
+            self.assertEqual(len(list(dc.iter_machines(stream=True))), 7)
+            both = dc.metrics.as_dict()['endpoints']['GET /machines']
+        finally:
+            dc.session.close()
+        decoded = both['bytes_received'] - read['bytes_received']
+        wire = both['wire_bytes_received'] - read['wire_bytes_received']
+        self.assertEqual(decoded, read['bytes_received'])
+        self.assertEqual(wire, read['wire_bytes_received'])
+        self.assertTrue(0 < wire < decoded)
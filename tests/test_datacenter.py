@@ -0,0 +1,73 @@
+import unittest
+
+from smartdc.simulator import CloudAPISimulator
+
+
+class ListingTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=10, page_limit=3)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_pages_are_complete_and_in_order(self):
+        # jitter lets concurrently requested pages arrive out of order
+        self.sim.jitter = 0.02
+        for workers in (1, 4):
+            before = self.sim.requests
+            machines = self.dc.machines(workers=workers)
+            self.assertEqual([m.id for m in machines], self.sim._order)
+            # 10 machines in pages of 3: offsets 0, 3, 6 and 9
+            self.assertEqual(self.sim.requests - before, 4)
+
+    def test_remaining_offsets(self):
+        class Response(object):
+            def __init__(self, count, limit):
+                self.headers = {'x-resource-count': str(count),
+                                'x-query-limit': str(limit)}
+        offsets = self.dc._remaining_offsets
+        self.assertEqual(offsets(Response(10, 3), 0, 3), [3, 6, 9])
+        self.assertEqual(offsets(Response(9, 3), 0, 3), [3, 6])
+        self.assertEqual(offsets(Response(3, 3), 0, 3), [])
+        self.assertEqual(offsets(Response(10, 3), 4, 3), [7])
+        self.assertEqual(offsets(Response(10, 3), 0, 0), [])
+        self.assertEqual(offsets(Response('many', 3), 0, 3), [])
+
+    def test_short_page_ends_the_listing(self):
+        doomed = self.sim._order[4:]
+
+        def shrink(method, path, resp, elapsed):
+            # delete most of the fleet once the first page has been served
+            for machine_id in doomed:
+                self.sim.machines[machine_id]['state'] = 'deleted'
+        self.dc.hooks['after_request'].append(shrink)
+        before = self.sim.requests
+        machines = self.dc.machines()
+        # offsets 3 (one machine left) and 6 and 9 would be empty
+        self.assertEqual([m.id for m in machines], self.sim._order[:4])
+        self.assertEqual(self.sim.requests - before, 2)
+
+    def test_iter_machines_requests_a_page_at_a_time(self):
+        before = self.sim.requests
+        machines = self.dc.iter_machines(limit=2)
+        first = next(machines)
+        self.assertEqual(self.sim.requests - before, 1)
+        ids = [first.id] + [m.id for m in machines]
+        self.assertEqual(ids, self.sim._order)
+        # 10 machines in pages of 2, the last of which ends the listing
+        self.assertEqual(self.sim.requests - before, 5)
+        for stream in (False, True):
+            self.assertEqual([m.id for m in self.dc.iter_machines(limit=4,
+                offset=3, stream=stream)], self.sim._order[3:])
+            # the simulator's page_limit caps larger pages at 3
+            before = self.sim.requests
+            self.assertEqual(len(list(self.dc.iter_machines(limit=50,
+                stream=stream))), 10)
+            self.assertEqual(self.sim.requests - before, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
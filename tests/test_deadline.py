@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+
+from smartdc.deadline import (Deadline, DeadlineExceeded, current_deadline,
+                              propagate)
+from smartdc.simulator import CloudAPISimulator
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_nested_deadlines_clamp_to_the_inner_one(self):
+        self.assertEqual(current_deadline(), None)
+        with Deadline(10) as outer:
+            with Deadline(60) as longer:
+                self.assertTrue(current_deadline() is longer)
+                self.assertEqual(longer.expires, outer.expires)
+            with Deadline(0.5) as shorter:
+                self.assertTrue(shorter.expires < outer.expires)
+                self.assertTrue(shorter.clamp((5, None))[0] <= 0.5)
+            self.assertTrue(current_deadline() is outer)
+        self.assertEqual(current_deadline(), None)
+
+    def test_propagate(self):
+        seen = []
+
+        def work():
+            seen.append(current_deadline())
+        self.assertTrue(propagate(work) is work)
+        with Deadline(10) as deadline:
+            thread = threading.Thread(target=propagate(work))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [deadline])
+
+    def test_clamp(self):
+        with Deadline(1) as deadline:
+            self.assertTrue(deadline.clamp(None) <= 1)
+            self.assertEqual(deadline.clamp(0.25), 0.25)
+            self.assertEqual(deadline.clamp((0.25, None))[0], 0.25)
+        self.assertRaises(DeadlineExceeded, Deadline(-1).clamp, 5)
+
+
+class SimulatedDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=10, page_limit=2)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_spent_budget_raises_before_sending(self):
+        with Deadline(0.01):
+            time.sleep(0.02)
+            before = self.sim.requests
+            self.assertRaises(DeadlineExceeded, self.dc.machines)
+            self.assertEqual(self.sim.requests, before)
+
+    def test_deadline_reaches_page_workers(self):
+        seen = []
+
+        def record(method, path, headers):
+            seen.append((threading.current_thread(), current_deadline()))
+        self.dc.hooks['before_request'].append(record)
+        with Deadline(30) as deadline:
+            self.assertEqual(len(self.dc.machines(workers=4)), 10)
+        main = threading.current_thread()
+        workers = [d for thread, d in seen if thread is not main]
+        # the first page on this thread, the other four on workers
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(workers), 4)
+        self.assertTrue(all(d is deadline for d in workers))
+
+    def test_deadline_bounds_concurrent_pages(self):
+        # the first page takes 0.2s, and the others would end at 0.4s
+        self.sim.latency = 0.2
+        with Deadline(0.3):
+            self.assertRaises(DeadlineExceeded, self.dc.machines, workers=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+
+from requests.exceptions import HTTPError
+
+from smartdc.fleet import FULL_LISTING_EVERY, bulk_action
+from smartdc.machine import Machine
+from smartdc.simulator import CloudAPISimulator
+
+
+class WaitForStateTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=4, transition_time=0.05)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+        self.machines = self.dc.machines(state='running')
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def wait(self, machines, state, filtered):
+        seen = []
+        reached, pending, ended = self.dc.wait_for_state(machines, state,
+            interval=0.02, callback=seen.append, filtered=filtered)
+        self.assertEqual(sorted(m.id for m in seen),
+                         sorted(m.id for m in reached))
+        return reached, pending, ended
+
+    def test_terminal_machines_end_the_wait(self):
+        running, failing, deleting = self.machines[:3]
+        running.stop()
+        self.sim.machines[failing.id]['state'] = 'failed'
+        deleting.delete()
+        for filtered in (True, False):
+            for m in (running, failing, deleting):
+                m.state = None
+            reached, pending, ended = self.wait(
+                [running, failing, deleting], 'stopped', filtered)
+            self.assertEqual([m.id for m in reached], [running.id])
+            self.assertEqual(pending, [])
+            self.assertEqual(sorted(m.id for m in ended),
+                             sorted([failing.id, deleting.id]))
+            self.assertEqual(failing.state, 'failed')
+            self.assertEqual(deleting.state, 'deleted')
+
+    def test_filtered_wait_makes_one_listing_per_tick(self):
+        stopping, failing = self.machines[:2]
+        stopping.stop()
+        stopping.poll_until('stopped', interval=0.02)
+        before = self.sim.requests
+        reached, _, _ = self.wait([stopping], 'stopped', True)
+        self.assertEqual(reached, [stopping])
+        self.assertEqual(self.sim.requests - before, 1)
+        self.sim.machines[failing.id]['state'] = 'failed'
+        before = self.sim.requests
+        _, _, ended = self.wait([failing], 'stopped', True)
+        self.assertEqual(ended, [failing])
+        self.assertEqual(self.sim.requests - before, FULL_LISTING_EVERY)
+
+    def test_wait_for_deleted(self):
+        doomed = self.machines[0]
+        doomed.delete()
+        for filtered in (True, False):
+            reached, pending, ended = self.wait([doomed], 'deleted',
+                                                filtered)
+            self.assertEqual(reached, [doomed])
+            self.assertEqual((pending, ended), ([], []))
+
+    def test_missing_machine_unfiltered(self):
+        ghost = Machine(self.dc, data={
+            'id': '00000000-0000-0000-0000-000000000000', 'state': 'running'})
+        reached, pending, ended = self.wait([ghost], 'stopped', False)
+        self.assertEqual((reached, pending), ([], []))
+        self.assertEqual(ended, [ghost])
+        self.assertEqual(ghost.state, 'deleted')
+
+    def test_timeout_leaves_machines_pending(self):
+        reached, pending, ended = self.dc.wait_for_state(self.machines[:1],
+            'stopped', interval=0.02, timeout=0.1)
+        self.assertEqual((reached, ended), ([], []))
+        self.assertEqual(pending, self.machines[:1])
+
+class BulkActionTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=4)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+        self.machines = self.dc.machines(state='running')
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_named_action(self):
+        result = self.dc.bulk_action(self.machines, 'stop', concurrency=2)
+        self.assertEqual(result.summary(), {'action': 'stop', 'total': 3,
+            'succeeded': 3, 'failed': 0, 'failures': {}})
+        self.assertTrue(result.done)
+        for machine in self.machines:
+            self.assertTrue(self.sim.machines[machine.id]['state'] in
+                            ('stopping', 'stopped'))
+
+    def test_raising_callable_is_a_failure(self):
+        broken = self.machines[1]
+
+        def tag(machine, role):
+            if machine is broken:
+                raise ValueError(machine.name)
+            return machine.add_tags(role=role)
+        result = self.dc.bulk_action(self.machines, tag, role='db')
+        failures = result.failures()
+        self.assertEqual(list(failures), [broken])
+        self.assertTrue(isinstance(failures[broken], ValueError))
+        self.assertEqual(sorted(m.id for m in result.results()),
+                         sorted(m.id for m in self.machines
+                                if m is not broken))
+        summary = result.summary()
+        self.assertEqual((summary['action'], summary['total'],
+                          summary['succeeded'], summary['failed']),
+                         ('tag', 3, 2, 1))
+        self.assertEqual(self.sim.machines[broken.id]['tags']['role'],
+                         broken.tags['role'])
+
+    def test_server_errors_are_failures(self):
+        self.sim.error_rate = 1.0
+        failures = self.dc.bulk_action(self.machines, 'stop').failures()
+        self.assertEqual(len(failures), 3)
+        for error in failures.values():
+            self.assertTrue(isinstance(error, HTTPError))
+
+    def test_no_machines(self):
+        result = bulk_action([], 'stop')
+        self.assertEqual(len(result), 0)
+        self.assertEqual(result.summary()['total'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
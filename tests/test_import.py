@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), 'benchmarks', 'import_time.py')
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_import_is_lazy_and_within_budget(self):
+        proc = subprocess.Popen([sys.executable, SCRIPT, '--runs', '5'],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        output = proc.communicate()[0].decode('utf-8')
+        self.assertEqual(proc.returncode, 0, output)
+
+
+if __name__ == '__main__':
+    unittest.main()
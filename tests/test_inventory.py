@@ -0,0 +1,161 @@
+import time
+import unittest
+
+from smartdc.inventory import MachineInventory
+from smartdc.simulator import CloudAPISimulator, iso_time
+
+
+class IndexTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=4)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+        self.machines = self.dc.machines()
+        self.inventory = MachineInventory(self.machines)
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def names(self, machines):
+        return sorted(m.name for m in machines)
+
+    def test_lookups(self):
+        inventory = self.inventory
+        first = self.machines[0]
+        self.assertEqual(len(inventory), 4)
+        self.assertTrue(inventory.get(first.id) is first)
+        self.assertTrue(inventory.by_name('machine-0') is first)
+        for ip in first._ips:
+            self.assertTrue(inventory.by_ip(ip) is first)
+        self.assertEqual(inventory.by_state('stopped'), [first])
+        self.assertEqual(self.names(inventory.by_state('running')),
+                         ['machine-1', 'machine-2', 'machine-3'])
+        self.assertEqual(self.names(inventory.by_tag('role', 'web')),
+                         ['machine-0', 'machine-3'])
+        self.assertEqual(len(inventory.by_tag('role')), 4)
+        self.assertEqual(inventory.by_tag('role', 'none'), [])
+        self.assertEqual(len(inventory.by_package(first.package)), 4)
+        self.assertEqual(inventory.by_image(first.image), [first])
+        self.assertEqual(inventory.by_dataset(first.dataset), [first])
+        self.assertEqual(inventory.counts('state'),
+                         {'stopped': 1, 'running': 3})
+        self.assertEqual(inventory.by_name('missing'), None)
+        self.assertEqual(inventory.by_ip('192.0.2.1'), None)
+
+    def test_update_reindexes(self):
+        machine = self.machines[1]
+        machine.stop()
+        machine.refresh()
+        self.inventory.update([machine])
+        self.assertEqual(len(self.inventory), 4)
+        self.assertEqual(self.inventory.counts('state'),
+                         {'stopped': 2, 'running': 2})
+        self.assertTrue(machine in self.inventory.by_state('stopped'))
+
+    def test_complete_update_removes_missing_machines(self):
+        doomed = self.machines[2]
+        doomed.delete()
+        self.inventory.update(self.dc.machines())
+        self.assertTrue(doomed in self.inventory)
+        self.inventory.update(self.dc.machines(), complete=True)
+        self.assertFalse(doomed in self.inventory)
+        self.assertEqual(self.inventory.by_name(doomed.name), None)
+        self.assertEqual(self.inventory.by_tag('role', 'cache'), [])
+        for ip in doomed._ips:
+            self.assertEqual(self.inventory.by_ip(ip), None)
+        self.assertEqual(sum(self.inventory.counts('package').values()), 3)
+
+    def test_add_and_remove(self):
+        machine = self.machines[3]
+        self.assertTrue(self.inventory.remove(machine.id) is machine)
+        self.assertEqual(self.inventory.remove(machine), None)
+        self.assertEqual(self.names(self.inventory.by_tag('role', 'web')),
+                         ['machine-0'])
+        self.inventory.add(machine)
+        self.inventory.add(machine)
+        self.assertEqual(len(self.inventory), 4)
+        self.assertEqual(self.names(self.inventory.by_tag('role', 'web')),
+                         ['machine-0', 'machine-3'])
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=4)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+        self.inventory = self.dc.inventory()
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_unchanged_listing_is_left_alone(self):
+        machines = dict((m.id, m) for m in self.inventory)
+        self.assertEqual(self.inventory.refresh(), ([], [], []))
+        self.assertEqual(self.inventory.refresh(), ([], [], []))
+        for machine in self.inventory:
+            self.assertTrue(machines[machine.id] is machine)
+
+    def test_stopped_machine_is_changed_in_place(self):
+        machine = self.inventory.by_name('machine-1')
+        machine.stop()
+        added, removed, changed = self.inventory.refresh()
+        self.assertEqual((len(added), len(removed), len(changed)), (0, 0, 1))
+        self.assertTrue(changed[0] is machine)
+        self.assertEqual(machine.state, 'stopped')
+        self.assertFalse(machine in self.inventory.by_state('running'))
+        self.assertTrue(machine in self.inventory.by_state('stopped'))
+        self.assertEqual(self.inventory.refresh(), ([], [], []))
+
+    def test_newer_updated_timestamp_is_a_change(self):
+        machine = self.inventory.by_name('machine-2')
+        data = self.sim.machines[machine.id]
+        data['updated'] = iso_time(time.time() + 3600)
+        data['tags'] = {'role': 'queue'}
+        _, _, changed = self.inventory.refresh()
+        self.assertEqual(changed, [machine])
+        self.assertEqual(self.inventory.by_tag('role', 'queue'), [machine])
+        self.assertEqual(self.inventory.by_tag('role', 'cache'), [])
+
+    def test_deleted_machine_leaves_every_index(self):
+        machine = self.inventory.by_name('machine-3')
+        ips = list(machine._ips)
+        machine.delete()
+        added, removed, changed = self.inventory.refresh()
+        self.assertEqual((added, removed, changed), ([], [machine], []))
+        self.assertFalse(machine in self.inventory)
+        self.assertEqual(len(self.inventory), 3)
+        self.assertEqual(self.inventory.get(machine.id), None)
+        self.assertEqual(self.inventory.by_name('machine-3'), None)
+        for ip in ips:
+            self.assertEqual(self.inventory.by_ip(ip), None)
+        for lookup in (self.inventory.by_state(machine.state),
+                       self.inventory.by_state('running'),
+                       self.inventory.by_package(machine.package),
+                       self.inventory.by_image(machine.image),
+                       self.inventory.by_dataset(machine.dataset),
+                       self.inventory.by_tag('role'),
+                       self.inventory.by_tag('role', 'web')):
+            self.assertFalse(machine in lookup)
+        self.assertFalse('machine-3' in self.inventory.counts('name'))
+        self.assertEqual(sum(self.inventory.counts('state').values()), 3)
+
+    def test_new_machine_is_added(self):
+        self.dc.create_machine(name='extra')
+        added, removed, changed = self.inventory.refresh()
+        self.assertEqual(([m.name for m in added], removed, changed),
+                         (['extra'], [], []))
+        self.assertTrue(self.inventory.by_name('extra') is added[0])
+        self.assertTrue(added[0].datacenter is self.dc)
+
+    def test_refresh_reuses_the_listing_predicates(self):
+        running = self.dc.inventory(state='running')
+        self.assertEqual(len(running), 3)
+        machine = running.by_name('machine-1')
+        machine.stop()
+        self.assertEqual(running.refresh(), ([], [machine], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from requests.exceptions import HTTPError
+
+from smartdc.machine import timestamp
+from smartdc.simulator import CloudAPISimulator
+
+
+class DeletedMachineTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=1, transition_time=0.05)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+        self.machine = self.dc.machines()[0]
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_status_of_deleted_machine(self):
+        self.machine.delete()
+        self.assertEqual(self.machine.poll_until('deleted', interval=0.02),
+            'deleted')
+        self.assertEqual(self.machine.status(), 'deleted')
+
+    def test_status_of_unknown_machine(self):
+        self.machine.id = '00000000-0000-0000-0000-000000000000'
+        self.assertEqual(self.machine.status(), 'deleted')
+
+    def test_refresh_still_raises(self):
+        self.machine.delete()
+        self.machine.poll_until('deleted', interval=0.02)
+        self.assertRaises(HTTPError, self.machine.refresh)
+
+
+class TimestampTest(unittest.TestCase):
+    def test_timestamp(self):
+        self.assertEqual(timestamp('1970-01-01T00:00:10.000Z'), 10)
+        self.assertEqual(timestamp('2013-06-17T12:00:00Z'), 1371470400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from requests.exceptions import HTTPError
+
+from smartdc.metrics import RequestMetrics, endpoint_template
+from smartdc.simulator import CloudAPISimulator
+
+
+class EndpointTemplateTest(unittest.TestCase):
+    def test_identifiers_collapse(self):
+        uuid = '4a5ed2fc-0d34-4ed0-8f32-4c2d3e4f8b0a'
+        self.assertEqual(endpoint_template('/machines'), '/machines')
+        self.assertEqual(endpoint_template('/machines/' + uuid),
+                         '/machines/:id')
+        self.assertEqual(endpoint_template('/machines/{0}/tags/role'.format(
+            uuid)), '/machines/:id/tags/:tag')
+        self.assertEqual(endpoint_template(
+            '/machines/{0}/snapshots/nightly/'.format(uuid)),
+            '/machines/:id/snapshots/:name')
+        self.assertEqual(endpoint_template('/datacenters/us-east-1'),
+                         '/datacenters/:name')
+
+
+class RequestMetricsTest(unittest.TestCase):
+    def test_as_dict(self):
+        metrics = RequestMetrics(buckets=(0.1, 1.0))
+        metrics.record('GET', '/machines/a', 200, 0.05, received=100,
+                       wire=40)
+        metrics.record('GET', '/machines/b', 404, 2.0, received=10)
+        metrics.record_retry('GET', '/machines/b')
+        metrics.record_signing(0.5)
+        snapshot = metrics.as_dict()
+        endpoint = snapshot['endpoints']['GET /machines/:id']
+        self.assertEqual(endpoint['statuses'], {'200': 1, '404': 1})
+        self.assertEqual(endpoint['latency']['buckets'],
+                         [(0.1, 1), (1.0, 1), ('+Inf', 2)])
+        self.assertEqual(endpoint['latency']['count'], 2)
+        self.assertEqual(endpoint['bytes_received'], 110)
+        self.assertEqual(endpoint['wire_bytes_received'], 50)
+        self.assertEqual(endpoint['retries'], 1)
+        self.assertEqual((snapshot['signatures'], snapshot['signing_time']),
+                         (1, 0.5))
+
+    def test_label_values_are_escaped(self):
+        metrics = RequestMetrics()
+        text = metrics.prometheus(labels={'dc': 'a\\b "c"\nd'})
+        self.assertTrue('smartdc_signatures_total{dc="a\\\\b \\"c\\"\\nd"} 0'
+                        in text.splitlines(), text)
+
+
+class PrometheusTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=3)
+        self.sim.start()
+        self.dc = self.sim.datacenter()
+
+    def tearDown(self):
+        self.dc.session.close()
+        self.sim.stop()
+
+    def test_rendered_series(self):
+        for machine in self.dc.machines():
+            machine.get_tags()
+        self.assertRaises(HTTPError, self.dc.raw_machine_data,
+                          '00000000-0000-0000-0000-000000000000')
+        lines = self.dc.metrics.prometheus(labels={'dc': 'sim'}).splitlines()
+        self.assertTrue('# TYPE smartdc_request_duration_seconds histogram'
+                        in lines)
+        tags = 'dc="sim",endpoint="/machines/:id/tags"'
+        self.assertTrue('smartdc_request_duration_seconds_bucket{{{0},'
+                        'le="+Inf",method="GET"}} 3'.format(tags) in lines,
+                        lines)
+        self.assertTrue('smartdc_request_duration_seconds_count{{{0},'
+                        'method="GET"}} 3'.format(tags) in lines, lines)
+        self.assertTrue('smartdc_responses_total{{{0},method="GET",'
+                        'status="200"}} 3'.format(tags) in lines, lines)
+        self.assertTrue('smartdc_responses_total{dc="sim",'
+                        'endpoint="/machines/:id",method="GET",'
+                        'status="404"} 1' in lines, lines)
+        buckets = [line for line in lines if line.startswith(
+            'smartdc_request_duration_seconds_bucket{' + tags)]
+        counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+        self.assertEqual(len(buckets), len(self.dc.metrics.buckets) + 1)
+        self.assertEqual(counts, sorted(counts))
+
+
+if __name__ == '__main__':
+    unittest.main()
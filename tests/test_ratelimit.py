@@ -0,0 +1,40 @@
+import time
+import unittest
+
+from smartdc.ratelimit import RateLimiter, rate_limiter
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_default_burst_spaces_requests(self):
+        limiter = RateLimiter(rate=20)
+        self.assertEqual(limiter.burst, 1)
+        start = time.time()
+        for _ in range(4):
+            limiter.release(limiter.acquire())
+        # the first token is in the bucket, the other three take 50ms each
+        self.assertTrue(time.time() - start >= 0.14)
+
+    def test_burst_goes_out_at_once(self):
+        limiter = RateLimiter(rate=1, burst=4)
+        start = time.time()
+        for _ in range(4):
+            limiter.release(limiter.acquire())
+        self.assertTrue(time.time() - start < 0.5)
+
+
+class RegistryTest(unittest.TestCase):
+    def test_same_settings_share_a_limiter(self):
+        first = rate_limiter('http://registry-a', 'tester', rate=5)
+        second = rate_limiter('http://registry-a', 'tester', rate=5)
+        self.assertTrue(first is second)
+
+    def test_conflicting_settings_raise(self):
+        rate_limiter('http://registry-b', 'tester', rate=5)
+        self.assertRaises(ValueError, rate_limiter, 'http://registry-b',
+                          'tester', rate=10)
+        other = rate_limiter('http://registry-b', 'someone', rate=10)
+        self.assertEqual(other.rate, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
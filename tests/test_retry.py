@@ -0,0 +1,98 @@
+import time
+import unittest
+
+from requests.exceptions import HTTPError
+
+from smartdc.deadline import Deadline
+from smartdc.retry import RetryPolicy, retry_after
+from smartdc.simulator import CloudAPISimulator
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_retryable(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.retryable('GET', 503))
+        self.assertTrue(policy.retryable('delete', 502))
+        self.assertTrue(policy.retryable('GET'))
+        self.assertTrue(policy.retryable('POST', 429))
+        self.assertFalse(policy.retryable('POST', 503))
+        self.assertFalse(policy.retryable('POST'))
+        self.assertFalse(policy.retryable('GET', 404))
+        self.assertFalse(RetryPolicy(statuses=[503]).retryable('POST', 429))
+
+    def test_delay(self):
+        policy = RetryPolicy(backoff=0.5, max_backoff=3, jitter=0)
+        self.assertEqual([policy.delay(n) for n in range(1, 5)],
+                         [0.5, 1, 2, 3])
+        self.assertEqual(policy.delay(1, {'retry-after': '2'}), 2)
+        self.assertEqual(policy.delay(1, {'retry-after': '60'}), None)
+        self.assertEqual(policy.delay(1, {'retry-after': 'soon'}), 0.5)
+        ignoring = RetryPolicy(backoff=0.5, jitter=0, honor_retry_after=False)
+        self.assertEqual(ignoring.delay(1, {'retry-after': '2'}), 0.5)
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after('1.5'), 1.5)
+        self.assertEqual(retry_after(None), None)
+        self.assertEqual(retry_after('Thu, 01 Jan 1970 00:00:00 GMT'), 0)
+
+    def test_wait(self):
+        policy = RetryPolicy(retries=2, backoff=1, jitter=0)
+        self.assertEqual(policy.wait(0, 'GET', 503), 1)
+        self.assertEqual(policy.wait(1, 'GET', 503), 2)
+        self.assertEqual(policy.wait(2, 'GET', 503), None)
+        self.assertEqual(policy.wait(0, 'GET', 200), None)
+        with Deadline(0.5) as deadline:
+            self.assertEqual(policy.wait(0, 'GET', 503, deadline=deadline),
+                             None)
+
+
+class SimulatedRetryTest(unittest.TestCase):
+    def setUp(self):
+        self.dcs = []
+
+    def tearDown(self):
+        for dc in self.dcs:
+            dc.session.close()
+
+    def datacenter(self, sim, **kwargs):
+        dc = sim.datacenter(**kwargs)
+        self.dcs.append(dc)
+        return dc
+
+    def test_failed_gets_are_retried(self):
+        with CloudAPISimulator(fleet_size=10, error_rate=0.3, seed=7) as sim:
+            dc = self.datacenter(sim, retry=RetryPolicy(retries=20,
+                                                        backoff=0.001))
+            for _ in range(20):
+                self.assertTrue(dc.packages())
+            retries = dc.metrics.as_dict()['endpoints']['GET /packages']
+            self.assertTrue(sim.errors > 0)
+            self.assertEqual(retries['retries'], sim.errors)
+            self.assertEqual(retries['statuses'], {'200': 20})
+
+    def test_failed_posts_are_not_retried(self):
+        with CloudAPISimulator(fleet_size=1) as sim:
+            dc = self.datacenter(sim, retry=RetryPolicy(backoff=0.001))
+            machine = dc.machines()[0]
+            sim.error_rate = 1.0
+            before = sim.requests
+            self.assertRaises(HTTPError, machine.add_tags, role='db')
+            self.assertEqual(sim.requests - before, 1)
+
+    def test_throttled_requests_are_retried_whatever_the_verb(self):
+        with CloudAPISimulator(fleet_size=1) as sim:
+            dc = self.datacenter(sim)
+            machine = dc.machines()[0]
+            sim.rate_limit = 1
+            # start at the top of a second, so both requests share it
+            time.sleep(1.01 - time.time() % 1)
+            machine.get_tags()
+            machine.add_tags(role='db')
+            self.assertEqual(sim.throttled, 1)
+            self.assertEqual(sim.machines[machine.id]['tags']['role'], 'db')
+            retried = dc.metrics.as_dict()['endpoints']
+            self.assertEqual(retried['POST /machines/:id/tags']['retries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from smartdc.simulator import CloudAPISimulator
+
+
+class HandleTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = CloudAPISimulator(fleet_size=3)
+        self.machine_id = self.sim._order[0]
+
+    def test_reply_is_a_snapshot(self):
+        status, payload, _ = self.sim.handle('GET',
+            '/simulator/machines/' + self.machine_id, {}, None, {})
+        self.assertEqual(status, 200)
+        self.sim.handle('PUT', '/simulator/machines/{0}/tags'.format(
+            self.machine_id), {}, {'added': 'later'}, {})
+        self.assertFalse('added' in payload['tags'])
+        self.assertEqual(self.sim.machines[self.machine_id]['tags']['added'],
+                         'later')
+
+    def test_not_modified_has_no_body(self):
+        _, _, headers = self.sim.handle('GET', '/simulator/packages', {},
+                                        None, {})
+        status, payload, _ = self.sim.handle('GET', '/simulator/packages', {},
+            None, {'If-None-Match': headers['ETag']})
+        self.assertEqual((status, payload), (304, None))
+
+    def test_errors_are_json(self):
+        status, payload, _ = self.sim.handle('GET',
+            '/simulator/machines/missing', {}, None, {})
+        self.assertEqual(status, 404)
+        self.assertEqual(payload['code'], 'ResourceNotFound')
+
+
+if __name__ == '__main__':
+    unittest.main()
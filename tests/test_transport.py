@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from smartdc.datacenter import DataCenter
+from smartdc.simulator import CloudAPISimulator
+from smartdc.transport import RecordingSession, ReplaySession, ReplayError
+
+
+def replay_datacenter(session):
+    return DataCenter(location='replay',
+                      known_locations={'replay': 'http://replay'},
+                      login='simulator', session=session, retry=False)
+
+
+class RecordReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, name):
+        path = os.path.join(self.directory, name)
+        with CloudAPISimulator(fleet_size=5, page_limit=2) as sim:
+            session = RecordingSession(path)
+            dc = sim.datacenter(session=session, retry=False)
+            machines = [m.id for m in dc.machines()]
+            packages = dc.packages()
+            session.close()
+        return path, machines, packages
+
+    def test_round_trip(self):
+        for name in ('traffic.jsonl', 'traffic.jsonl.gz'):
+            path, machines, packages = self.record(name)
+            session = ReplaySession(path)
+            dc = replay_datacenter(session)
+            self.assertEqual([m.id for m in dc.machines()], machines)
+            self.assertEqual(dc.packages(), packages)
+            self.assertEqual(session.remaining(), 0)
+
+    def test_strict_replay_runs_out(self):
+        path, _, _ = self.record('traffic.jsonl')
+        dc = replay_datacenter(ReplaySession(path))
+        dc.packages()
+        self.assertRaises(ReplayError, dc.packages)
+        self.assertRaises(ReplayError, dc.datasets)
+
+    def test_lenient_replay_repeats(self):
+        path, _, packages = self.record('traffic.jsonl')
+        dc = replay_datacenter(ReplaySession(path, strict=False))
+        dc.packages()
+        self.assertEqual(dc.packages(), packages)
+
+    def test_timing_follows_recorded_start(self):
+        path = os.path.join(self.directory, 'paced.jsonl')
+        with io.open(path, 'w', encoding='utf-8') as f:
+            for at in (0, 0.3):
+                f.write(json.dumps({
+                    'method': 'GET', 'path': '/simulator/packages',
+                    'params': [], 'status': 200,
+                    'headers': {'content-type': 'application/json'},
+                    'body': '[]', 'elapsed': 0.01, 'at': at}) + u'\n')
+        for speed, expected in ((1.0, 0.31), (2.0, 0.155)):
+            dc = replay_datacenter(ReplaySession(path, timing=True,
+                                                 speed=speed))
+            start = time.time()
+            dc.request('GET', '/packages')
+            dc.request('GET', '/packages')
+            took = time.time() - start
+            self.assertTrue(expected - 0.01 <= took < expected + 0.2, took)
+
+
+if __name__ == '__main__':
+    unittest.main()